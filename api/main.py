@@ -1,6 +1,8 @@
 """
 FastAPI main application for Travel Explorer
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -8,15 +10,59 @@ from dotenv import load_dotenv
 
 # Import routers
 from api.routers import flights, hotels, trips
+from api.mcp.client import MCPClient
+from api.mcp.health import MCPHealthMonitor
+from api.services.executor import shutdown_executor
+from api.services.flight_service import FlightService
+from api.services.hotel_service import HotelService
+from api.services.restaurant_prefetch import RESTAURANT_PREFETCH, RestaurantPrefetcher
+from api.services.trip_service import TripService
+from backend.http_pool import close_clients, aclose_clients
+from backend import hotel_search
+from backend.LLMchat import snowflake_pool
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Load the embedding model and Pinecone index at startup instead of on the first hotel search
+HOTEL_SEARCH_WARMUP = os.getenv("HOTEL_SEARCH_WARMUP", "false").lower() in ("1", "true", "yes")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services once at startup and tear them down at shutdown."""
+    mcp_client = MCPClient()
+    mcp_health = MCPHealthMonitor(mcp_client)
+    await mcp_health.start()
+    
+    app.state.mcp_health = mcp_health
+    app.state.flight_service = FlightService()
+    app.state.hotel_service = HotelService()
+    app.state.trip_service = TripService(mcp_client=mcp_client, health_monitor=mcp_health)
+    
+    if HOTEL_SEARCH_WARMUP:
+        await asyncio.to_thread(hotel_search.warm_up)
+    
+    app.state.restaurant_prefetcher = None
+    if RESTAURANT_PREFETCH:
+        app.state.restaurant_prefetcher = RestaurantPrefetcher()
+        await app.state.restaurant_prefetcher.start()
+    
+    yield
+    
+    if app.state.restaurant_prefetcher is not None:
+        await app.state.restaurant_prefetcher.stop()
+    await mcp_health.stop()
+    shutdown_executor()
+    snowflake_pool.close()
+    await aclose_clients()
+    close_clients()
+
 # Create FastAPI app
 app = FastAPI(
     title="Travel Explorer API",
     description="API for the Travel Explorer application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -2,13 +2,20 @@
 MCP Client for Trip Planning
 """
 import os
-import requests
+import httpx
 import logging
-from typing import Dict, Any, Optional, List, Union
-import json
+from typing import Dict, Any, Optional, List, Union, Iterator, AsyncIterator
+
+from backend.http_pool import get_async_client, get_client, build_timeout
+from backend.sse import aparse_sse, parse_sse
 
 logger = logging.getLogger(__name__)
 
+# Itinerary generation can take a minute or more, so the MCP read timeout is separate
+MCP_READ_TIMEOUT = float(os.getenv("MCP_READ_TIMEOUT", "180"))
+# Health probes should fail fast: a hung server must read as unhealthy, not stall the probe
+MCP_HEALTH_TIMEOUT = float(os.getenv("MCP_HEALTH_TIMEOUT", "3"))
+
 class MCPClient:
     """
     Client for interacting with the MCP (Model Calling Protocol) server for Trip Planning.
@@ -19,21 +26,24 @@ class MCPClient:
     3. Analyze user preferences for better suggestions
     """
     
-    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, read_timeout: float = MCP_READ_TIMEOUT):
         """
         Initialize the MCP client.
         
         Args:
             base_url: Base URL for the MCP server
             api_key: API key for authentication
+            read_timeout: Read timeout in seconds for MCP responses
         """
         self.base_url = base_url or os.getenv("MCP_SERVER_URL", "http://localhost:8080")
         self.api_key = api_key or os.getenv("MCP_API_KEY", "")
+        self.timeout = build_timeout(read=read_timeout)
         
         if not self.api_key:
             logger.warning("No MCP API key provided. Some functionality may be limited.")
     
-    def _make_request(self, endpoint: str, method: str = "GET", data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _make_request(self, endpoint: str, method: str = "GET", data: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[httpx.Timeout] = None) -> Dict[str, Any]:
         """
         Make a request to the MCP server.
         
@@ -41,6 +51,7 @@ class MCPClient:
             endpoint: API endpoint to call
             method: HTTP method (GET, POST, etc.)
             data: Request payload
+            timeout: Overrides the client's timeout for this request
             
         Returns:
             Response data as dictionary
@@ -48,20 +59,29 @@ class MCPClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
         
+        client = get_client(self.base_url)
+        timeout = timeout or self.timeout
+        
         try:
             if method.upper() == "GET":
-                response = requests.get(url, headers=headers, params=data)
+                response = client.get(url, headers=headers, params=data, timeout=timeout)
             elif method.upper() == "POST":
                 headers["Content-Type"] = "application/json"
-                response = requests.post(url, headers=headers, json=data)
+                response = client.post(url, headers=headers, json=data, timeout=timeout)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error making request to MCP server: {str(e)}")
             return {"error": str(e)}
+        
+        try:
+            return response.json()
+        except ValueError as e:
+            # Non-JSON or truncated body: report it like any other failed request
+            logger.error(f"Invalid response from MCP server: {str(e)}")
+            return {"error": f"Invalid response from MCP server: {str(e)}"}
     
     def generate_itinerary(self, 
                           city: str, 
@@ -73,7 +93,9 @@ class MCPClient:
                           hotel_info: str,
                           interests: List[str] = None,
                           trip_style: str = "balanced",
-                          budget_level: str = "medium") -> Dict[str, Any]:
+                          budget_level: str = "medium",
+                          use_cache: bool = True,
+                          structured: bool = False) -> Dict[str, Any]:
         """
         Generate a personalized travel itinerary.
         
@@ -88,12 +110,24 @@ class MCPClient:
             interests: List of user interests
             trip_style: Style of the trip (relaxed, balanced, intensive)
             budget_level: Budget level (budget, medium, luxury)
+            use_cache: Set to False to skip the MCP server's response cache
+            structured: Have the MCP server request schema-validated JSON from the LLM
             
         Returns:
             Dictionary containing the generated itinerary
         """
         endpoint = "/generate/itinerary"
+        data = self._itinerary_payload(
+            city, attractions, restaurants, departure_date, return_date,
+            flight_info, hotel_info, interests, trip_style, budget_level, use_cache, structured
+        )
         
+        return self._make_request(endpoint, method="POST", data=data)
+    
+    def _itinerary_payload(self, city, attractions, restaurants, departure_date, return_date,
+                           flight_info, hotel_info, interests, trip_style, budget_level,
+                           use_cache=True, structured=False) -> Dict[str, Any]:
+        """Request body shared by generate_itinerary and stream_itinerary."""
         # Convert restaurant data to a format suitable for the MCP server
         restaurant_data = []
         for r in restaurants:
@@ -118,17 +152,89 @@ class MCPClient:
             "hotel_info": hotel_info,
             "interests": interests or [],
             "trip_style": trip_style,
-            "budget_level": budget_level
+            "budget_level": budget_level,
+            "use_cache": use_cache,
+            "structured": structured
         }
         
-        return self._make_request(endpoint, method="POST", data=data)
+        return data
+    
+    def stream_itinerary(self, 
+                         city: str, 
+                         attractions: List[str], 
+                         restaurants: List[Dict[str, Any]], 
+                         departure_date: str, 
+                         return_date: Optional[str], 
+                         flight_info: str, 
+                         hotel_info: str,
+                         interests: List[str] = None,
+                         trip_style: str = "balanced",
+                         budget_level: str = "medium",
+                         use_cache: bool = True,
+                         structured: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Generate an itinerary, yielding events as the MCP server streams them.
+        
+        Takes the same arguments as generate_itinerary.
+        
+        Yields:
+            {"event": "token", "data": {"text": ...}} for each piece of text, then
+            {"event": "done", "data": <generate_itinerary response>}, or
+            {"event": "error", "data": {"error": ...}} if the request fails
+        """
+        url, headers, data = self._stream_request(
+            city, attractions, restaurants, departure_date, return_date,
+            flight_info, hotel_info, interests, trip_style, budget_level, use_cache, structured
+        )
+        
+        try:
+            with get_client(self.base_url).stream("POST", url, headers=headers, json=data, timeout=self.timeout) as response:
+                response.raise_for_status()
+                yield from parse_sse(response.iter_lines())
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from MCP server: {str(e)}")
+            yield {"event": "error", "data": {"error": str(e)}}
+    
+    async def astream_itinerary(self, *args, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async stream_itinerary on the shared async connection pool.
+        
+        Takes the same arguments and yields the same events. Closing the generator
+        (aclose) closes the upstream response.
+        """
+        url, headers, data = self._stream_request(*args, **kwargs)
+        
+        try:
+            async with get_async_client(self.base_url).stream("POST", url, headers=headers, json=data, timeout=self.timeout) as response:
+                response.raise_for_status()
+                async for event in aparse_sse(response.aiter_lines()):
+                    yield event
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from MCP server: {str(e)}")
+            yield {"event": "error", "data": {"error": str(e)}}
+    
+    def _stream_request(self, city, attractions, restaurants, departure_date, return_date,
+                        flight_info, hotel_info, interests=None, trip_style="balanced",
+                        budget_level="medium", use_cache=True, structured=False):
+        """URL, headers and body for the streaming itinerary endpoint."""
+        url = f"{self.base_url}/generate/itinerary/stream"
+        headers = {"Accept": "text/event-stream"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        data = self._itinerary_payload(
+            city, attractions, restaurants, departure_date, return_date,
+            flight_info, hotel_info, interests, trip_style, budget_level, use_cache, structured
+        )
+        return url, headers, data
     
     def get_travel_recommendations(self, 
                                  city: str, 
                                  interests: List[str] = None,
                                  budget: str = "medium",
                                  duration: int = 3,
-                                 travelers: Dict[str, Any] = None) -> Dict[str, Any]:
+                                 travelers: Dict[str, Any] = None,
+                                 use_cache: bool = True,
+                                 structured: bool = False) -> Dict[str, Any]:
         """
         Get travel recommendations based on user interests.
         
@@ -138,6 +244,8 @@ class MCPClient:
             budget: Budget level (budget, medium, luxury)
             duration: Trip duration in days
             travelers: Information about travelers (adults, children, etc.)
+            use_cache: Set to False to skip the MCP server's response cache
+            structured: Have the MCP server request schema-validated JSON from the LLM
             
         Returns:
             Dictionary containing recommendations
@@ -149,17 +257,32 @@ class MCPClient:
             "interests": interests or ["sightseeing", "food", "culture"],
             "budget": budget,
             "duration": duration,
-            "travelers": travelers or {"adults": 1, "children": 0}
+            "travelers": travelers or {"adults": 1, "children": 0},
+            "use_cache": use_cache,
+            "structured": structured
         }
         
         return self._make_request(endpoint, method="POST", data=data)
     
-    def health_check(self) -> Dict[str, Any]:
+    def health_check(self, read_timeout: float = MCP_HEALTH_TIMEOUT) -> Dict[str, Any]:
         """
         Check the health of the MCP server.
         
+        Args:
+            read_timeout: Read timeout in seconds; a server that does not answer in time is reported as an error
+        
         Returns:
             Dictionary containing health status
         """
         endpoint = "/health"
+        return self._make_request(endpoint, method="GET", timeout=build_timeout(read=read_timeout, connect=read_timeout))
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit rates and size of the MCP server's LLM response cache.
+        
+        Returns:
+            Dictionary containing cache statistics
+        """
+        endpoint = "/cache/stats"
         return self._make_request(endpoint, method="GET")
\ No newline at end of file
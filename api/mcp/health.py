@@ -0,0 +1,78 @@
+"""
+Background health probe for the MCP server
+"""
+import os
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from api.mcp.client import MCP_HEALTH_TIMEOUT, MCPClient
+
+logger = logging.getLogger(__name__)
+
+# Seconds between MCP health probes
+MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+
+class MCPHealthMonitor:
+    """
+    Periodically probes the MCP server's /health endpoint in the background
+    and caches the result, so request handlers never pay for the probe.
+    """
+    
+    def __init__(self, client: MCPClient, interval: float = MCP_HEALTH_INTERVAL, timeout: float = MCP_HEALTH_TIMEOUT):
+        """
+        Initialize the health monitor.
+        
+        Args:
+            client: MCP client used for the probe
+            interval: Seconds between probes
+            timeout: Seconds before a probe gives up and marks the server unavailable
+        """
+        self.client = client
+        self.interval = interval
+        self.timeout = timeout
+        self.available = False
+        self.last_checked: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def check(self) -> bool:
+        """
+        Probe the MCP server once and update the cached status.
+        
+        Returns:
+            True if the MCP server reported healthy
+        """
+        try:
+            health_response = await asyncio.to_thread(self.client.health_check, self.timeout)
+            available = health_response.get("status") == "healthy"
+        except Exception as e:
+            logger.warning(f"MCP health probe failed: {str(e)}")
+            available = False
+        
+        if available != self.available or self.last_checked is None:
+            logger.info(f"MCP server status: {'Available' if available else 'Unavailable'}")
+        self.available = available
+        self.last_checked = time.time()
+        return available
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+    
+    async def start(self) -> None:
+        """Run an initial probe, then keep probing in the background."""
+        await self.check()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background probe."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
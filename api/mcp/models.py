@@ -30,6 +30,8 @@ class ItineraryRequest(BaseModel):
     interests: List[str] = []
     trip_style: str = "balanced"
     budget_level: str = "medium"
+    use_cache: bool = True
+    structured: Optional[bool] = None
 
 class RecommendationRequest(BaseModel):
     """Request model for getting travel recommendations"""
@@ -38,6 +40,8 @@ class RecommendationRequest(BaseModel):
     budget: str = "medium"
     duration: int = Field(3, ge=1, le=30)
     travelers: Optional[Dict[str, Any]] = None
+    use_cache: bool = True
+    structured: Optional[bool] = None
 
 class DailyPlan(BaseModel):
     """Model for a daily plan in the itinerary"""
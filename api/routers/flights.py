@@ -1,7 +1,7 @@
 """
 API router for flight-related endpoints
 """
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import Dict, Any, Optional, List
 from datetime import date, datetime
 from pydantic import BaseModel, Field
@@ -25,9 +25,9 @@ class FlightSearchRequest(BaseModel):
     deep_search: bool = Field(False, description="Whether to perform a deep search")
 
 # Dependencies
-def get_flight_service() -> FlightService:
-    """Dependency for flight service"""
-    return FlightService()
+def get_flight_service(request: Request) -> FlightService:
+    """Dependency for flight service (shared instance built at startup)"""
+    return request.app.state.flight_service
 
 @router.get("/search", response_model=Dict[str, Any])
 async def search_flights(
@@ -56,7 +56,7 @@ async def search_flights(
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
         
         # Search flights
-        flights = flight_service.search_flights(
+        flights = await flight_service.asearch_flights(
             origin=origin,
             destination=destination,
             departure_date=departure_date,
@@ -92,7 +92,7 @@ async def search_flights_post(
         return_date = request.return_date.strftime("%Y-%m-%d") if request.return_date else None
         
         # Search flights
-        flights = flight_service.search_flights(
+        flights = await flight_service.asearch_flights(
             origin=request.origin,
             destination=request.destination,
             departure_date=departure_date,
@@ -136,7 +136,7 @@ async def get_best_flights(
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
         
         # Get best flights
-        flights = flight_service.get_best_flights(
+        flights = await flight_service.aget_best_flights(
             origin=origin,
             destination=destination,
             departure_date=departure_date,
@@ -151,4 +151,54 @@ async def get_best_flights(
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/round-trip", response_model=Dict[str, Any])
+async def get_round_trip_flights(
+    origin: str = Query(..., description="Origin IATA code", min_length=3, max_length=3),
+    destination: str = Query(..., description="Destination IATA code", min_length=3, max_length=3),
+    departure_date: str = Query(..., description="Departure date (YYYY-MM-DD)"),
+    return_date: str = Query(..., description="Return date (YYYY-MM-DD)"),
+    max_results: int = Query(5, description="Maximum number of results to return per leg", ge=1, le=10),
+    max_pairings: int = Query(10, description="Maximum number of outbound/return pairings", ge=1, le=100),
+    deep_search: bool = Query(True, description="Whether to perform a deep search"),
+    flight_service: FlightService = Depends(get_flight_service)
+) -> Dict[str, Any]:
+    """
+    Get the best outbound and return flights plus precomputed pairings in a single call.
+    """
+    try:
+        # Format dates
+        try:
+            datetime.strptime(departure_date, "%Y-%m-%d")
+            datetime.strptime(return_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+        
+        flights = await flight_service.aget_round_trip_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            max_results=max_results,
+            max_pairings=max_pairings,
+            deep_search=deep_search
+        )
+        
+        if "error" in flights:
+            raise HTTPException(status_code=400, detail=flights["error"])
+        
+        return flights
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_flight_cache_stats(
+    flight_service: FlightService = Depends(get_flight_service)
+) -> Dict[str, Any]:
+    """
+    Get flight search cache statistics.
+    """
+    return flight_service.get_cache_stats()
@@ -1,7 +1,7 @@
 """
 API router for hotel-related endpoints
 """
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import Dict, Any, Optional, List
 from datetime import date, datetime
 from pydantic import BaseModel, Field
@@ -23,9 +23,9 @@ class HotelSearchRequest(BaseModel):
     max_results: int = Field(10, description="Maximum number of results to return", ge=1, le=50)
 
 # Dependencies
-def get_hotel_service() -> HotelService:
-    """Dependency for hotel service"""
-    return HotelService()
+def get_hotel_service(request: Request) -> HotelService:
+    """Dependency for hotel service (shared instance built at startup)"""
+    return request.app.state.hotel_service
 
 @router.get("/search", response_model=Dict[str, Any])
 async def search_hotels(
@@ -58,7 +58,7 @@ async def search_hotels(
             amenities_list = [a.strip() for a in amenities.split(",")]
         
         # Search hotels
-        hotels = hotel_service.search_hotels(
+        hotels = await hotel_service.asearch_hotels(
             city=city,
             check_in_date=check_in_date,
             check_out_date=check_out_date,
@@ -92,7 +92,7 @@ async def search_hotels_post(
         check_out_date = request.check_out_date.strftime("%Y-%m-%d") if request.check_out_date else None
         
         # Search hotels
-        hotels = hotel_service.search_hotels(
+        hotels = await hotel_service.asearch_hotels(
             city=request.city,
             check_in_date=check_in_date,
             check_out_date=check_out_date,
@@ -124,6 +124,15 @@ async def get_available_amenities(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_hotel_cache_stats(
+    hotel_service: HotelService = Depends(get_hotel_service)
+) -> Dict[str, Any]:
+    """
+    Get hotel query-embedding cache statistics.
+    """
+    return hotel_service.get_cache_stats()
+
 @router.get("/details/{hotel_id}", response_model=Dict[str, Any])
 async def get_hotel_details(
     hotel_id: str,
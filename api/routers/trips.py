@@ -1,12 +1,15 @@
 """
 API router for trip planning endpoints
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, Body
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Body
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional, List
 from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 from api.services.trip_service import TripService
+from backend.sse import format_sse
+from backend.LLMchat import snowflake_pool
 from api.mcp.models import ItineraryRequest, RecommendationRequest
 
 router = APIRouter()
@@ -25,9 +28,9 @@ class TripPlanRequest(BaseModel):
     budget_level: str = Field("medium", description="Budget level (budget, medium, luxury)")
 
 # Dependencies
-def get_trip_service() -> TripService:
-    """Dependency for trip service"""
-    return TripService()
+def get_trip_service(request: Request) -> TripService:
+    """Dependency for trip service (shared instance built at startup)"""
+    return request.app.state.trip_service
 
 @router.post("/plan", response_model=Dict[str, Any])
 async def plan_trip(
@@ -46,7 +49,7 @@ async def plan_trip(
         return_date = request.return_date.strftime("%Y-%m-%d") if request.return_date else None
         
         # Plan trip
-        trip_plan = trip_service.plan_trip(
+        trip_plan = await trip_service.aplan_trip(
             destination=request.destination,
             departure_date=departure_date,
             return_date=return_date,
@@ -67,6 +70,43 @@ async def plan_trip(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/plan/stream")
+async def plan_trip_stream(
+    request: TripPlanRequest,
+    trip_service: TripService = Depends(get_trip_service)
+) -> StreamingResponse:
+    """
+    Plan a trip, streaming the itinerary as Server-Sent Events.
+    
+    Emits "token" events ({"text": ...}) while the itinerary is generated, then a
+    "done" event with the same body as /plan (timings include "ttft", the time to
+    first token in ms), or an "error" event.
+    """
+    plan_args = {
+        "destination": request.destination,
+        "departure_date": request.departure_date.strftime("%Y-%m-%d"),
+        "return_date": request.return_date.strftime("%Y-%m-%d") if request.return_date else None,
+        "stay_nights": request.stay_nights,
+        "flight": request.flight,
+        "hotel": request.hotel,
+        "interests": request.interests,
+        "trip_style": request.trip_style,
+        "budget_level": request.budget_level
+    }
+    
+    async def events():
+        try:
+            async for event in trip_service.astream_plan_trip(**plan_args):
+                yield format_sse(event["event"], event["data"])
+        except Exception as e:
+            yield format_sse("error", {"error": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/recommendations", response_model=Dict[str, Any])
 async def get_travel_recommendations(
     destination: str = Query(..., description="Destination city or IATA code"),
@@ -93,7 +133,7 @@ async def get_travel_recommendations(
         }
         
         # Get recommendations
-        recommendations = trip_service.get_travel_recommendations(
+        recommendations = await trip_service.aget_travel_recommendations(
             destination=destination,
             interests=interests_list,
             budget=budget,
@@ -123,12 +163,14 @@ async def get_travel_recommendations_post(
         travelers = request.travelers or {"adults": 1, "children": 0}
         
         # Get recommendations
-        recommendations = trip_service.get_travel_recommendations(
+        recommendations = await trip_service.aget_travel_recommendations(
             destination=request.destination,
             interests=request.interests,
             budget=request.budget,
             duration=request.duration,
-            travelers=travelers
+            travelers=travelers,
+            use_cache=request.use_cache,
+            structured=request.structured
         )
         
         if "error" in recommendations:
@@ -172,7 +214,7 @@ async def generate_itinerary(
         }
         
         # Generate itinerary through the trip planning service
-        result = trip_service.plan_trip(
+        result = await trip_service.aplan_trip(
             destination=request.city,
             departure_date=request.departure_date,
             return_date=request.return_date,
@@ -181,7 +223,9 @@ async def generate_itinerary(
             hotel=hotel,
             interests=request.interests,
             trip_style=request.trip_style,
-            budget_level=request.budget_level
+            budget_level=request.budget_level,
+            use_cache=request.use_cache,
+            structured=request.structured
         )
         
         if "error" in result:
@@ -200,4 +244,21 @@ async def check_mcp_status(
     """
     Check if the MCP server is available.
     """
-    return {"available": trip_service.mcp_available}
\ No newline at end of file
+    return {"available": trip_service.mcp_available}
+
+@router.get("/restaurants/prefetch", response_model=Dict[str, Any])
+async def get_restaurant_prefetch_status(request: Request) -> Dict[str, Any]:
+    """
+    Get warm-up time and coverage of the background restaurant prefetch.
+    """
+    prefetcher = request.app.state.restaurant_prefetcher
+    if prefetcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **prefetcher.stats()}
+
+@router.get("/snowflake/pool", response_model=Dict[str, Any])
+async def get_snowflake_pool_stats() -> Dict[str, Any]:
+    """
+    Get Snowflake session pool usage and acquire wait times.
+    """
+    return snowflake_pool.stats()
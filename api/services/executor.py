@@ -0,0 +1,49 @@
+"""
+Bounded thread pool for running blocking service calls off the event loop
+"""
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Maximum number of blocking calls (SerpAPI, Snowflake, Pinecone, OpenAI) in flight per worker
+SERVICE_THREADPOOL_SIZE = int(os.getenv("SERVICE_THREADPOOL_SIZE", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the shared service thread pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SERVICE_THREADPOOL_SIZE,
+                thread_name_prefix="service"
+            )
+    return _executor
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in the service thread pool and await its result.
+    
+    Args:
+        func: Blocking function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_executor() -> None:
+    """Shut down the shared service thread pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -9,7 +9,7 @@ import sys
 
 # Add the backend directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-from backend.flight_search import FlightDataExtractor
+from backend.flight_search import FlightDataExtractor, _run_sync
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +34,36 @@ class FlightService:
         
         self.extractor = FlightDataExtractor(api_key=self.api_key)
     
+    def _validate_dates(self, departure_date: str, return_date: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Validate search dates.
+        
+        Args:
+            departure_date: Departure date (YYYY-MM-DD)
+            return_date: Return date (YYYY-MM-DD)
+            
+        Returns:
+            Error dictionary if the dates are invalid, otherwise None
+        """
+        today = date.today()
+        try:
+            dep_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
+            
+            if dep_date <= today:
+                logger.warning(f"Invalid departure date: {departure_date}")
+                return {"error": "Departure date must be in the future"}
+            
+            if return_date:
+                ret_date = datetime.strptime(return_date, "%Y-%m-%d").date()
+                if ret_date <= dep_date:
+                    logger.warning(f"Invalid return date: {return_date}")
+                    return {"error": "Return date must be after departure date"}
+        except ValueError:
+            logger.warning(f"Invalid date format: {departure_date} or {return_date}")
+            return {"error": "Invalid date format. Use YYYY-MM-DD format."}
+        
+        return None
+    
     def search_flights(
         self,
         origin: str,
@@ -65,29 +95,47 @@ class FlightService:
         Returns:
             Dictionary containing flight information
         """
+        return _run_sync(self.asearch_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            adults=adults,
+            children=children,
+            infants=infants,
+            travel_class=travel_class,
+            stops=stops,
+            deep_search=deep_search
+        ))
+    
+    async def asearch_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        adults: int = 1,
+        children: int = 0,
+        infants: int = 0,
+        travel_class: int = 1,
+        stops: int = 0,
+        deep_search: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Search for flights without blocking the event loop.
+        
+        Same arguments and return value as search_flights, which runs this on the
+        flight engine's loop.
+        """
         logger.info(f"Searching flights from {origin} to {destination} on {departure_date}")
         
         # Validate dates
-        today = date.today()
-        try:
-            dep_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
-            
-            if dep_date <= today:
-                logger.warning(f"Invalid departure date: {departure_date}")
-                return {"error": "Departure date must be in the future"}
-            
-            if return_date:
-                ret_date = datetime.strptime(return_date, "%Y-%m-%d").date()
-                if ret_date <= dep_date:
-                    logger.warning(f"Invalid return date: {return_date}")
-                    return {"error": "Return date must be after departure date"}
-        except ValueError:
-            logger.warning(f"Invalid date format: {departure_date} or {return_date}")
-            return {"error": "Invalid date format. Use YYYY-MM-DD format."}
+        error = self._validate_dates(departure_date, return_date)
+        if error:
+            return error
         
-        # Search flights
         try:
-            raw_data = self.extractor.search_flights(
+            raw_data = await self.extractor.asearch_flights(
                 origin=origin,
                 destination=destination,
                 departure_date=departure_date,
@@ -100,9 +148,7 @@ class FlightService:
                 stops=stops
             )
             
-            # Extract information
-            flights = self.extractor.extract_important_flight_info(raw_data)
-            return flights
+            return self.extractor.extract_important_flight_info(raw_data)
         
         except Exception as e:
             logger.error(f"Error searching flights: {str(e)}")
@@ -144,9 +190,30 @@ class FlightService:
         Returns:
             Dictionary containing the best flights
         """
+        return _run_sync(self.aget_best_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            max_results=max_results
+        ))
+    
+    async def aget_best_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        max_results: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Get the best flights without blocking the event loop.
+        
+        Same arguments and return value as get_best_flights.
+        """
         logger.info(f"Getting best flights from {origin} to {destination} on {departure_date}")
         
-        flights = self.search_flights(
+        flights = await self.asearch_flights(
             origin=origin,
             destination=destination,
             departure_date=departure_date,
@@ -154,6 +221,102 @@ class FlightService:
             deep_search=True
         )
         
+        return self._select_best(flights, max_results)
+    
+    def get_round_trip_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        max_results: int = 5,
+        max_pairings: int = 10,
+        deep_search: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Get the best outbound and return flights plus precomputed pairings in one call.
+        
+        Args:
+            origin: Origin IATA code
+            destination: Destination IATA code
+            departure_date: Departure date (YYYY-MM-DD)
+            return_date: Return date (YYYY-MM-DD)
+            max_results: Maximum number of flights to return per leg
+            max_pairings: Maximum number of outbound/return pairings to return
+            deep_search: Whether to perform a deep search
+            
+        Returns:
+            Dictionary containing both legs and pairings sorted by total price
+        """
+        return _run_sync(self.aget_round_trip_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            max_results=max_results,
+            max_pairings=max_pairings,
+            deep_search=deep_search
+        ))
+    
+    async def aget_round_trip_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        max_results: int = 5,
+        max_pairings: int = 10,
+        deep_search: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Get round-trip flights without blocking the event loop.
+        
+        Same arguments and return value as get_round_trip_flights.
+        """
+        logger.info(f"Getting round-trip flights {origin} <-> {destination} ({departure_date} - {return_date})")
+        
+        flights = await self.asearch_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            deep_search=deep_search
+        )
+        
+        return self._with_pairings(self._select_best(flights, max_results), max_pairings)
+    
+    def _with_pairings(self, flights: Dict[str, Any], max_pairings: int) -> Dict[str, Any]:
+        """
+        Add outbound/return pairings, cheapest total first.
+        
+        Each pairing references flights by their index in outbound_flights and return_flights.
+        """
+        if "error" in flights:
+            return flights
+        
+        def price(flight: Dict[str, Any]) -> Optional[float]:
+            try:
+                return float(flight.get("price"))
+            except (TypeError, ValueError):
+                return None
+        
+        pairings = []
+        for i, outbound in enumerate(flights.get("outbound_flights", [])):
+            for j, ret in enumerate(flights.get("return_flights", [])):
+                out_price, ret_price = price(outbound), price(ret)
+                total = out_price + ret_price if out_price is not None and ret_price is not None else None
+                pairings.append({
+                    "outbound_index": i,
+                    "return_index": j,
+                    "total_price": total
+                })
+        
+        pairings.sort(key=lambda p: p["total_price"] if p["total_price"] is not None else float("inf"))
+        flights["pairings"] = pairings[:max_pairings]
+        return flights
+    
+    def _select_best(self, flights: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+        """Trim a flight search result to the top outbound and return flights."""
         if "error" in flights:
             return flights
         
@@ -167,6 +330,17 @@ class FlightService:
             "return_flights": return_flights
         }
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters for the flight response cache.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        if not self.extractor.cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.extractor.cache.stats()}
+
     def get_available_airlines(self) -> List[str]:
         """
         Get a list of available airlines.
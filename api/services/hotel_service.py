@@ -8,7 +8,8 @@ import logging
 
 # Add the backend directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-from backend.hotel_search import query_hotels
+from backend.hotel_search import query_hotels, get_query_embedding_cache
+from api.services.executor import run_blocking
 try:
     from backend.get_hotels_from_api import HotelDataExtractor
 except ImportError:
@@ -109,6 +110,16 @@ class HotelService:
             logger.error(f"Error searching hotels: {str(e)}")
             return {"error": str(e), "hotels": []}
     
+    async def asearch_hotels(self, **kwargs) -> Dict[str, Any]:
+        """
+        Search for hotels without blocking the event loop.
+        
+        Pinecone, the embedding model and SerpAPI are all blocking, so the
+        search runs in the shared service thread pool. Accepts the same
+        keyword arguments as search_hotels.
+        """
+        return await run_blocking(self.search_hotels, **kwargs)
+    
     def search_hotels_api(
         self,
         city: str,
@@ -221,6 +232,18 @@ class HotelService:
         
         return filtered
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters for the hotel query-embedding cache.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        cache = get_query_embedding_cache()
+        if not cache:
+            return {"enabled": False}
+        return {"enabled": True, **cache.stats()}
+    
     def get_available_amenities(self) -> List[str]:
         """
         Get a list of available hotel amenities for filtering.
@@ -0,0 +1,111 @@
+"""
+Background restaurant cache warm-up for the supported cities
+"""
+import os
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.LLMchat import prefetch_restaurants
+from api.services.trip_service import (
+    IATA_CITY_MAPPING, PLAN_RESTAURANT_LIMIT, RECOMMENDATION_RESTAURANT_LIMIT
+)
+
+logger = logging.getLogger(__name__)
+
+# Enable the startup/background prefetch, and how often to refresh it (seconds).
+# Keep the interval below RESTAURANT_CACHE_TTL so cached cities never go cold.
+RESTAURANT_PREFETCH = os.getenv("RESTAURANT_PREFETCH", "false").lower() in ("1", "true", "yes")
+RESTAURANT_PREFETCH_INTERVAL = float(os.getenv("RESTAURANT_PREFETCH_INTERVAL", "3600"))
+# Comma-separated cities to prefetch; defaults to every city in IATA_CITY_MAPPING
+RESTAURANT_PREFETCH_CITIES = os.getenv("RESTAURANT_PREFETCH_CITIES", "")
+
+class RestaurantPrefetcher:
+    """
+    Loads restaurants for all configured cities with one batched Snowflake
+    query at startup and refreshes them on an interval, so no user request
+    pays for a cold restaurant lookup.
+    """
+
+    def __init__(
+        self,
+        cities: Optional[List[str]] = None,
+        limits: Optional[List[int]] = None,
+        interval: float = RESTAURANT_PREFETCH_INTERVAL
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            cities: Cities to prefetch (RESTAURANT_PREFETCH_CITIES or all mapped cities if omitted)
+            limits: Per-call-site restaurant limits to populate cache entries for
+            interval: Seconds between refreshes
+        """
+        configured = [c.strip() for c in RESTAURANT_PREFETCH_CITIES.split(",") if c.strip()]
+        self.cities = cities or configured or sorted(set(IATA_CITY_MAPPING.values()))
+        self.limits = limits or [PLAN_RESTAURANT_LIMIT, RECOMMENDATION_RESTAURANT_LIMIT]
+        self.interval = interval
+        self.last_refreshed: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_rows: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> bool:
+        """
+        Run one batched prefetch and record how long it took.
+
+        Returns:
+            True if the cache was refreshed
+        """
+        start = time.perf_counter()
+        try:
+            rows = await asyncio.to_thread(prefetch_restaurants, self.cities, self.limits)
+        except Exception as e:
+            logger.error(f"Restaurant prefetch failed: {str(e)}")
+            self.last_error = str(e)
+            return False
+
+        self.last_duration = time.perf_counter() - start
+        self.last_refreshed = time.time()
+        self.last_rows = rows
+        self.last_error = None
+        logger.info(
+            f"Prefetched {sum(rows.values())} restaurants for {len(rows)} cities "
+            f"in {self.last_duration:.2f}s"
+        )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Warm-up time and coverage of the most recent refresh."""
+        return {
+            "cities": len(self.cities),
+            "limits": self.limits,
+            "interval": self.interval,
+            "last_refreshed": self.last_refreshed,
+            "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "rows": self.last_rows,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Warm the cache before serving requests, then keep refreshing in the background."""
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
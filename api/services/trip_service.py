@@ -3,24 +3,48 @@ Trip service for handling trip planning operations
 """
 import os
 import sys
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterator, AsyncIterator
 import logging
+import time
 from datetime import datetime, date, timedelta
 import pandas as pd
 import requests
 
 # Add the backend directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-from backend.LLMchat import search_places, get_restaurants_from_snowflake, generate_itinerary
+from backend.LLMchat import (
+    search_places, get_restaurants_from_snowflake, search_attractions_and_restaurants, generate_itinerary,
+    run_lookups
+)
 from backend.trip_planner import generate_itinerary_text
 
 # Import MCP client
 from api.mcp.client import MCPClient
+from api.mcp.health import MCPHealthMonitor
+from api.services.executor import run_blocking
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Restaurants fetched per city: the itinerary prompt needs more options than the recommendations fallback
+PLAN_RESTAURANT_LIMIT = int(os.getenv("PLAN_RESTAURANT_LIMIT", "20"))
+RECOMMENDATION_RESTAURANT_LIMIT = int(os.getenv("RECOMMENDATION_RESTAURANT_LIMIT", "10"))
+# Per-source deadlines (seconds) for the plan_trip gather stage; a slow source is skipped
+PLAN_ATTRACTIONS_TIMEOUT = float(os.getenv("PLAN_ATTRACTIONS_TIMEOUT", "8"))
+PLAN_RESTAURANTS_TIMEOUT = float(os.getenv("PLAN_RESTAURANTS_TIMEOUT", "8"))
+# Ask the MCP server for schema-validated JSON instead of prose it has to parse
+MCP_STRUCTURED_OUTPUT = os.getenv("MCP_STRUCTURED_OUTPUT", "false").lower() in ("1", "true", "yes")
+
+# Supported airports and the city names used for restaurant/attraction lookups
+IATA_CITY_MAPPING = {
+    "ATL": "atlanta", "AUS": "austin", "BOS": "boston", "ORD": "chicago", 
+    "DFW": "dallas", "DEN": "denver", "IAH": "houston", "IND": "indianapolis", 
+    "LAS": "las_vegas", "LAX": "los_angeles", "MIA": "miami", "BNA": "nashville", 
+    "JFK": "new_york", "PHL": "philadelphia", "PHX": "phoenix", "SAT": "san_antonio", 
+    "SFO": "san_francisco", "SJC": "san_jose", "SEA": "seattle", "IAD": "washington_dc"
+}
+
 class TripService:
     """
     Service for handling trip planning operations.
@@ -32,7 +56,9 @@ class TripService:
         serp_api_key: Optional[str] = None,
         openai_api_key: Optional[str] = None,
         mcp_url: Optional[str] = None,
-        mcp_api_key: Optional[str] = None
+        mcp_api_key: Optional[str] = None,
+        mcp_client: Optional[MCPClient] = None,
+        health_monitor: Optional[MCPHealthMonitor] = None
     ):
         """
         Initialize the trip service.
@@ -42,6 +68,9 @@ class TripService:
             openai_api_key: API key for OpenAI
             mcp_url: URL for the MCP server
             mcp_api_key: API key for the MCP server
+            mcp_client: Existing MCP client to share (built from mcp_url/mcp_api_key if omitted)
+            health_monitor: Background MCP health monitor; if omitted the MCP
+                server is probed once here
         """
         self.serp_api_key = serp_api_key or os.getenv("SERP_API_KEY")
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
@@ -50,19 +79,28 @@ class TripService:
             logger.warning("SERP_API_KEY not found in environment variables.")
         
         # Initialize MCP client
-        self.mcp_client = MCPClient(
+        self.mcp_client = mcp_client or MCPClient(
             base_url=mcp_url or os.getenv("MCP_SERVER_URL"),
             api_key=mcp_api_key or os.getenv("MCP_API_KEY")
         )
         
-        # Check MCP server status
-        try:
-            health_response = self.mcp_client.health_check()
-            self.mcp_available = health_response.get("status") == "healthy"
-            logger.info(f"MCP server status: {'Available' if self.mcp_available else 'Unavailable'}")
-        except Exception as e:
-            logger.warning(f"MCP server not available: {str(e)}. Using fallback methods.")
-            self.mcp_available = False
+        self.health_monitor = health_monitor
+        self._mcp_available = False
+        if health_monitor is None:
+            # Check MCP server status once for standalone use
+            try:
+                health_response = self.mcp_client.health_check()
+                self._mcp_available = health_response.get("status") == "healthy"
+                logger.info(f"MCP server status: {'Available' if self._mcp_available else 'Unavailable'}")
+            except Exception as e:
+                logger.warning(f"MCP server not available: {str(e)}. Using fallback methods.")
+    
+    @property
+    def mcp_available(self) -> bool:
+        """Cached MCP server availability."""
+        if self.health_monitor is not None:
+            return self.health_monitor.available
+        return self._mcp_available
     
     def _get_city_name(self, destination: str) -> str:
         """
@@ -76,18 +114,11 @@ class TripService:
         """
         # Map IATA code to city name if applicable
         if len(destination) == 3 and destination.isalpha() and destination.isupper():
-            iata_city_mapping = {
-                "ATL": "atlanta", "AUS": "austin", "BOS": "boston", "ORD": "chicago", 
-                "DFW": "dallas", "DEN": "denver", "IAH": "houston", "IND": "indianapolis", 
-                "LAS": "las_vegas", "LAX": "los_angeles", "MIA": "miami", "BNA": "nashville", 
-                "JFK": "new_york", "PHL": "philadelphia", "PHX": "phoenix", "SAT": "san_antonio", 
-                "SFO": "san_francisco", "SJC": "san_jose", "SEA": "seattle", "IAD": "washington_dc"
-            }
-            return iata_city_mapping.get(destination, destination.lower())
+            return IATA_CITY_MAPPING.get(destination, destination.lower())
         
         return destination.lower()
     
-    def plan_trip(
+    def _prepare_plan(
         self,
         destination: str,
         departure_date: str,
@@ -97,24 +128,16 @@ class TripService:
         hotel: Optional[Dict[str, Any]] = None,
         interests: List[str] = None,
         trip_style: str = "balanced",
-        budget_level: str = "medium"
+        budget_level: str = "medium",
+        use_cache: bool = True,
+        structured: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
-        Plan a trip with the specified parameters.
+        Gather attractions and restaurants and format the trip details shared by
+        plan_trip and stream_plan_trip.
         
-        Args:
-            destination: Destination city or IATA code
-            departure_date: Departure date (YYYY-MM-DD)
-            return_date: Return date (YYYY-MM-DD)
-            stay_nights: Number of nights to stay (for one-way trips)
-            flight: Selected flight information
-            hotel: Selected hotel information
-            interests: List of user interests
-            trip_style: Style of the trip (relaxed, balanced, intensive)
-            budget_level: Budget level (budget, medium, luxury)
-            
         Returns:
-            Dictionary containing the trip plan
+            Planning context: generation arguments plus gather timings and errors
         """
         logger.info(f"Planning trip to {destination} from {departure_date} to {return_date or 'N/A'}")
         
@@ -132,29 +155,33 @@ class TripService:
         # Normalize city name
         city_name = self._get_city_name(destination)
         
-        # Fetch attractions and restaurants ONCE and store in variables
-        try:
-            attractions = search_places(city_name)
-            logger.info(f"Found {len(attractions)} attractions for {city_name}")
-        except Exception as e:
-            logger.error(f"Error fetching attractions: {str(e)}")
+        # Fetch attractions and restaurants concurrently; either may fail or time out
+        # and the plan proceeds with whatever arrived
+        plan_start = time.perf_counter()
+        fetched, timings, gather_errors = run_lookups(
+            {
+                "attractions": lambda: search_places(city_name),
+                "restaurants": lambda: get_restaurants_from_snowflake(city_name, limit=PLAN_RESTAURANT_LIMIT),
+            },
+            {"attractions": PLAN_ATTRACTIONS_TIMEOUT, "restaurants": PLAN_RESTAURANTS_TIMEOUT},
+        )
+        
+        attractions = fetched.get("attractions", [])
+        if any(a.startswith("SerpAPI Error") for a in attractions):
+            gather_errors["attractions"] = attractions[0]
             attractions = []
         
-        # Store restaurants data to avoid duplicate queries
-        restaurant_data = None
-        try:
-            restaurants = get_restaurants_from_snowflake(city_name)
-            
-            # Convert to a standard format for reuse
-            if isinstance(restaurants, pd.DataFrame):
-                restaurant_data = restaurants.to_dict('records')
-                logger.info(f"Found {len(restaurants)} restaurants for {city_name}")
-            else:
-                restaurant_data = restaurants
-                logger.info(f"Found {len(restaurant_data)} restaurants for {city_name}")
-        except Exception as e:
-            logger.error(f"Error fetching restaurants: {str(e)}")
-            restaurant_data = []
+        restaurants = fetched.get("restaurants", [])
+        # Convert to a standard format for reuse
+        if isinstance(restaurants, pd.DataFrame):
+            restaurant_data = restaurants.to_dict('records')
+        else:
+            restaurant_data = restaurants
+        
+        for source, error in gather_errors.items():
+            logger.error(f"Error fetching {source} for {city_name}: {error}")
+        logger.info(f"Found {len(attractions)} attractions and {len(restaurant_data)} restaurants for {city_name}")
+        timings["gather"] = (time.perf_counter() - plan_start) * 1000
         
         # Format flight and hotel info
         flight_info = "Not specified"
@@ -186,88 +213,275 @@ class TripService:
                 f"Amenities: {', '.join(hotel.get('key_amenities', []))}"
             )
         
-        # Try to use MCP for enhanced itinerary generation
-        if self.mcp_available:
-            logger.info("Using MCP server for itinerary generation")
-            try:
-                # Use the already fetched restaurant data instead of fetching again
-                mcp_response = self.mcp_client.generate_itinerary(
-                    city=city_name,
-                    attractions=attractions,
-                    restaurants=restaurant_data,  # Use stored data
-                    departure_date=departure_date,
-                    return_date=return_date,
-                    flight_info=flight_info,
-                    hotel_info=hotel_info,
-                    interests=interests,
-                    trip_style=trip_style,
-                    budget_level=budget_level
-                )
-                
-                if "error" not in mcp_response:
-                    logger.info("Successfully generated itinerary with MCP")
-                    return {
-                        "itinerary": mcp_response.get("itinerary", ""),
-                        "highlights": mcp_response.get("highlights", []),
-                        "daily_plans": mcp_response.get("daily_plans", []),
-                        "estimated_costs": mcp_response.get("estimated_costs", {}),
-                        "source": "mcp"
-                    }
-                else:
-                    logger.error(f"Error from MCP: {mcp_response.get('error')}")
-            except Exception as e:
-                logger.error(f"Error using MCP for itinerary generation: {str(e)}")
-        
-        # Fallback to legacy method if MCP is not available or failed
+        return {
+            "mcp_args": {
+                "city": city_name,
+                "attractions": attractions,
+                "restaurants": restaurant_data,
+                "departure_date": departure_date,
+                "return_date": return_date,
+                "flight_info": flight_info,
+                "hotel_info": hotel_info,
+                "interests": interests,
+                "trip_style": trip_style,
+                "budget_level": budget_level,
+                "use_cache": use_cache,
+                "structured": MCP_STRUCTURED_OUTPUT if structured is None else structured
+            },
+            "flight": flight,
+            "hotel": hotel,
+            "duration": duration,
+            "plan_start": plan_start,
+            "timings": timings,
+            "gather_errors": gather_errors
+        }
+    
+    def _finish_plan(self, context: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach per-stage timings (ms) and any sources that were skipped."""
+        timings = context["timings"]
+        elapsed = (time.perf_counter() - context["plan_start"]) * 1000
+        timings["generation"] = elapsed - timings["gather"]
+        timings["total"] = elapsed
+        plan["timings"] = {stage: round(ms, 1) for stage, ms in timings.items()}
+        plan["partial_sources"] = sorted(context["gather_errors"])
+        return plan
+    
+    def _generate_legacy(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the itinerary without the MCP server."""
+        args = context["mcp_args"]
         logger.info("Falling back to legacy itinerary generation")
         try:
             # Use the already fetched data instead of fetching again
             try:
                 itinerary = generate_itinerary(
-                    city=city_name,
-                    attractions=attractions,  # Use stored data
-                    restaurants=restaurant_data,  # Use stored data 
-                    dep_date=departure_date,
-                    return_date=return_date,
-                    flight_info=flight_info,
-                    hotel_info=hotel_info
+                    city=args["city"],
+                    attractions=args["attractions"],  # Use stored data
+                    restaurants=args["restaurants"],  # Use stored data 
+                    dep_date=args["departure_date"],
+                    return_date=args["return_date"],
+                    flight_info=args["flight_info"],
+                    hotel_info=args["hotel_info"]
                 )
-                return {
+                return self._finish_plan(context, {
                     "itinerary": itinerary,
                     "highlights": [],
                     "daily_plans": [],
                     "estimated_costs": {},
                     "source": "legacy_llm"
-                }
+                })
             except Exception as e:
                 logger.error(f"Error using primary legacy method: {str(e)}")
                 # If that fails, try the alternative method
+                flight = context["flight"]
                 itinerary = generate_itinerary_text(
-                    flight_choice={"label": flight_info, "outbound": flight.get("outbound", {})},
-                    hotel_choice=hotel or {},
-                    restaurants=restaurant_data,  # Use stored data
-                    attractions=attractions,  # Use stored data
-                    num_days=duration
+                    flight_choice={"label": args["flight_info"], "outbound": flight.get("outbound", {})},
+                    hotel_choice=context["hotel"] or {},
+                    restaurants=args["restaurants"],  # Use stored data
+                    attractions=args["attractions"],  # Use stored data
+                    num_days=context["duration"]
                 )
                 
-                return {
+                return self._finish_plan(context, {
                     "itinerary": itinerary,
                     "highlights": [],
                     "daily_plans": [],
                     "estimated_costs": {},
                     "source": "legacy_alternative"
-                }
+                })
         except Exception as e:
             logger.error(f"All itinerary generation methods failed: {str(e)}")
             return {"error": f"Failed to generate itinerary: {str(e)}"}
     
+    def plan_trip(
+        self,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        stay_nights: Optional[int] = None,
+        flight: Optional[Dict[str, Any]] = None,
+        hotel: Optional[Dict[str, Any]] = None,
+        interests: List[str] = None,
+        trip_style: str = "balanced",
+        budget_level: str = "medium",
+        use_cache: bool = True,
+        structured: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan a trip with the specified parameters.
+        
+        Args:
+            destination: Destination city or IATA code
+            departure_date: Departure date (YYYY-MM-DD)
+            return_date: Return date (YYYY-MM-DD)
+            stay_nights: Number of nights to stay (for one-way trips)
+            flight: Selected flight information
+            hotel: Selected hotel information
+            interests: List of user interests
+            trip_style: Style of the trip (relaxed, balanced, intensive)
+            budget_level: Budget level (budget, medium, luxury)
+            use_cache: Set to False to skip the MCP server's response cache
+            structured: Request structured output from the MCP server
+                (defaults to MCP_STRUCTURED_OUTPUT)
+            
+        Returns:
+            Dictionary containing the trip plan
+        """
+        context = self._prepare_plan(
+            destination, departure_date, return_date, stay_nights, flight, hotel,
+            interests, trip_style, budget_level, use_cache, structured
+        )
+        
+        # Try to use MCP for enhanced itinerary generation
+        if self.mcp_available:
+            logger.info("Using MCP server for itinerary generation")
+            try:
+                # Use the already fetched restaurant data instead of fetching again
+                mcp_response = self.mcp_client.generate_itinerary(**context["mcp_args"])
+                
+                if "error" not in mcp_response:
+                    logger.info("Successfully generated itinerary with MCP")
+                    return self._finish_plan(context, {
+                        "itinerary": mcp_response.get("itinerary", ""),
+                        "highlights": mcp_response.get("highlights", []),
+                        "daily_plans": mcp_response.get("daily_plans", []),
+                        "estimated_costs": mcp_response.get("estimated_costs", {}),
+                        "source": "mcp"
+                    })
+                else:
+                    logger.error(f"Error from MCP: {mcp_response.get('error')}")
+            except Exception as e:
+                logger.error(f"Error using MCP for itinerary generation: {str(e)}")
+        
+        # Fallback to legacy method if MCP is not available or failed
+        return self._generate_legacy(context)
+    
+    def stream_plan_trip(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Plan a trip, yielding the itinerary text as it is generated.
+        
+        Accepts the same keyword arguments as plan_trip.
+        
+        Yields:
+            {"event": "token", "data": {"text": ...}} for each piece of itinerary text, then
+            {"event": "done", "data": <plan_trip response with "ttft" in timings>}, or
+            {"event": "error", "data": {"error": ...}}; "ttft" is measured from the start
+            of planning, gather stage included
+        """
+        context = self._prepare_plan(**kwargs)
+        
+        if self.mcp_available:
+            logger.info("Streaming itinerary from MCP server")
+            events = self.mcp_client.stream_itinerary(**context["mcp_args"])
+            try:
+                for event in events:
+                    relayed, outcome = self._relay_mcp_event(context, event)
+                    if relayed is not None:
+                        yield relayed
+                    if outcome == "done":
+                        return
+                    if outcome == "fallback":
+                        break
+                else:
+                    ended = self._mcp_stream_ended(context)
+                    if ended is not None:
+                        yield ended
+                        return
+            finally:
+                # Release the upstream connection (and MCP LLM slot) if our consumer goes away
+                events.close()
+        
+        yield from self._legacy_stream_events(context, self._generate_legacy(context))
+    
+    def _relay_mcp_event(self, context: Dict[str, Any], event: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Handle one event of the MCP itinerary stream.
+        
+        Returns:
+            (event to pass on or None, outcome): outcome is None to keep reading,
+            "done" to stop, or "fallback" to generate with the legacy generators
+        """
+        timings = context["timings"]
+        if event["event"] == "token":
+            if "ttft" not in timings:
+                timings["ttft"] = (time.perf_counter() - context["plan_start"]) * 1000
+                logger.info(f"Time to first itinerary token: {timings['ttft']:.0f} ms")
+            return event, None
+        if event["event"] == "done":
+            return {"event": "done", "data": self._finish_plan(context, {**event["data"], "source": "mcp"})}, "done"
+        if event["event"] == "error":
+            logger.error(f"Error streaming from MCP: {event['data'].get('error')}")
+            if "ttft" in timings:
+                # Text has already reached the client; a fallback would duplicate it
+                return event, "done"
+            return None, "fallback"
+        return None, None
+    
+    def _mcp_stream_ended(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Error event for an MCP stream that closed without "done" after sending text, else None (fall back)."""
+        if "ttft" in context["timings"]:
+            return {"event": "error", "data": {"error": "MCP stream ended before the itinerary was complete"}}
+        return None
+    
+    def _legacy_stream_events(self, context: Dict[str, Any], plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Stream events for a legacy plan: not incremental, so the whole text arrives at once."""
+        if "error" in plan:
+            return [{"event": "error", "data": plan}]
+        context["timings"]["ttft"] = (time.perf_counter() - context["plan_start"]) * 1000
+        plan["timings"]["ttft"] = round(context["timings"]["ttft"], 1)
+        return [{"event": "token", "data": {"text": plan["itinerary"]}}, {"event": "done", "data": plan}]
+    
+    async def aplan_trip(self, **kwargs) -> Dict[str, Any]:
+        """
+        Plan a trip without blocking the event loop.
+        
+        Accepts the same keyword arguments as plan_trip.
+        """
+        return await run_blocking(self.plan_trip, **kwargs)
+    
+    async def astream_plan_trip(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a trip plan without blocking the event loop.
+        
+        Accepts the same keyword arguments as plan_trip; yields the events of stream_plan_trip.
+        The MCP stream is read asynchronously, so only the gather stage and the legacy
+        fallback use the service thread pool.
+        """
+        context = await run_blocking(self._prepare_plan, **kwargs)
+        
+        if self.mcp_available:
+            logger.info("Streaming itinerary from MCP server")
+            events = self.mcp_client.astream_itinerary(**context["mcp_args"])
+            try:
+                async for event in events:
+                    relayed, outcome = self._relay_mcp_event(context, event)
+                    if relayed is not None:
+                        yield relayed
+                    if outcome == "done":
+                        return
+                    if outcome == "fallback":
+                        break
+                else:
+                    ended = self._mcp_stream_ended(context)
+                    if ended is not None:
+                        yield ended
+                        return
+            finally:
+                # Close the upstream stream now on disconnect or cancellation, not at garbage collection
+                await events.aclose()
+        
+        plan = await run_blocking(self._generate_legacy, context)
+        for event in self._legacy_stream_events(context, plan):
+            yield event
+    
     def get_travel_recommendations(
         self,
         destination: str,
         interests: List[str] = None,
         budget: str = "medium",
         duration: int = 3,
-        travelers: Dict[str, Any] = None
+        travelers: Dict[str, Any] = None,
+        use_cache: bool = True,
+        structured: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Get travel recommendations based on user interests.
@@ -278,6 +492,9 @@ class TripService:
             budget: Budget level (budget, medium, luxury)
             duration: Trip duration in days
             travelers: Information about travelers (adults, children, etc.)
+            use_cache: Set to False to skip the MCP server's response cache
+            structured: Request structured output from the MCP server
+                (defaults to MCP_STRUCTURED_OUTPUT)
             
         Returns:
             Dictionary containing recommendations
@@ -300,7 +517,9 @@ class TripService:
                     interests=interests,
                     budget=budget,
                     duration=duration,
-                    travelers=travelers
+                    travelers=travelers,
+                    use_cache=use_cache,
+                    structured=MCP_STRUCTURED_OUTPUT if structured is None else structured
                 )
             except Exception as e:
                 logger.error(f"Error using MCP for recommendations: {str(e)}")
@@ -308,8 +527,9 @@ class TripService:
         
         # Fallback: fetch basic recommendations
         logger.info(f"Falling back to basic recommendations for {city_name}")
-        attractions = search_places(city_name)
-        restaurants = get_restaurants_from_snowflake(city_name)
+        attractions, restaurants = search_attractions_and_restaurants(
+            city_name, restaurant_limit=RECOMMENDATION_RESTAURANT_LIMIT
+        )
         
         # Convert restaurants DataFrame to list of dicts if needed
         restaurant_list = restaurants
@@ -325,4 +545,12 @@ class TripService:
             "recommended_activities": [],  # No activity data in legacy mode
             "recommended_hotels": [],  # No hotel recommendations in legacy mode
             "source": "legacy"
-        }
\ No newline at end of file
+        }
+    
+    async def aget_travel_recommendations(self, **kwargs) -> Dict[str, Any]:
+        """
+        Get travel recommendations without blocking the event loop.
+        
+        Accepts the same keyword arguments as get_travel_recommendations.
+        """
+        return await run_blocking(self.get_travel_recommendations, **kwargs)
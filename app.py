@@ -18,6 +18,8 @@ load_dotenv(dotenv_path)
 # API URLs
 API_URL = os.getenv("API_URL", "http://localhost:8000/api")
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080")
+# Render the itinerary as it is generated (/trips/plan/stream) instead of waiting for /trips/plan
+STREAM_ITINERARY = os.getenv("STREAM_ITINERARY", "true").lower() in ("1", "true", "yes")
 
 # IATA to city name mapping
 iata_city_mapping = {
@@ -65,6 +67,41 @@ def wait_for_connections(max_retries=5, retry_delay=1):
     
     return api_available, mcp_available
 
+def stream_trip_plan(payload: dict, placeholder, timeout: int = 180):
+    """
+    Call /trips/plan/stream and render itinerary text into `placeholder` as it arrives.
+    Returns (trip_data, error, started): the final plan on success, otherwise the error
+    message; started is True once any event has arrived, after which a retry would
+    regenerate (and re-render) output the user has already seen.
+    """
+    text, event, started = "", "message", False
+    try:
+        with requests.post(f"{API_URL}/trips/plan/stream", json=payload, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                return None, response.text, False
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    started = True
+                    data = json.loads(line[len("data:"):])
+                    if event == "token":
+                        text += data.get("text", "")
+                        placeholder.markdown(text + " ▌")
+                    elif event == "done":
+                        placeholder.empty()
+                        return data, None, True
+                    elif event == "error":
+                        placeholder.empty()
+                        return None, data.get("error", "Unknown error"), True
+    except requests.RequestException as e:
+        if not started:
+            raise
+        placeholder.empty()
+        return None, str(e), True
+    placeholder.empty()
+    return None, "Itinerary stream ended unexpectedly", started
+
 def _display_flight_card(opt: dict):
     """Display a flight card in the UI."""
     st.write(f"**Price:** {opt['price']} | **Duration:** {opt['duration']} | **Stops:** {opt['stops']} | **Airlines:** {opt['airlines']}")
@@ -442,45 +479,38 @@ with tab_trip:
         # --- Flight Search ---
         with st.spinner("Searching for Flights..."):
             try:
-                # Outbound flight search
-                response = requests.get(
-                    f"{API_URL}/flights/best",
-                    params={
-                        "origin": origin_t,
-                        "destination": destination_t,
-                        "departure_date": dep,
-                        "return_date": None,  # Always one-way first
-                        "max_results": 5
-                    }
-                )
-                
-                if response.status_code == 200:
-                    outbound_flights = response.json()
-                    st.session_state.outbound_flights = outbound_flights
-                else:
-                    st.error(f"Error searching outbound flights: {response.text}")
-                    outbound_flights = {"error": "API error"}
-                    st.session_state.outbound_flights = outbound_flights
-
-                # Return flight search (if round-trip)
                 if trip_type == "Round-trip" and return_date_t:
+                    # Both legs and their pairings in a single call
+                    response = requests.get(
+                        f"{API_URL}/flights/round-trip",
+                        params={
+                            "origin": origin_t,
+                            "destination": destination_t,
+                            "departure_date": dep,
+                            "return_date": ret,
+                            "max_results": 5
+                        }
+                    )
+                else:
                     response = requests.get(
                         f"{API_URL}/flights/best",
                         params={
-                            "origin": destination_t,
-                            "destination": origin_t,
-                            "departure_date": ret,
+                            "origin": origin_t,
+                            "destination": destination_t,
+                            "departure_date": dep,
                             "return_date": None,
                             "max_results": 5
                         }
                     )
-                    
-                    if response.status_code == 200:
-                        return_flights = response.json()
-                        st.session_state.return_flights = return_flights
-                    else:
-                        st.error(f"Error searching return flights: {response.text}")
-                        st.session_state.return_flights = None
+                
+                if response.status_code == 200:
+                    flight_data = response.json()
+                    st.session_state.outbound_flights = flight_data
+                    st.session_state.return_flights = flight_data.get("return_flights") or None
+                else:
+                    st.error(f"Error searching flights: {response.text}")
+                    st.session_state.outbound_flights = {"error": "API error"}
+                    st.session_state.return_flights = None
             
             except Exception as e:
                 st.error(f"Error connecting to API: {str(e)}")
@@ -540,6 +570,27 @@ with tab_trip:
         st.write(f"Return Date: {info.get('return_date', 'One Way')}")
         st.markdown("---")
 
+        # ---- Suggested Pairings ----
+        pairings = outbound_flights.get("pairings", [])
+        if trip_type == "Round-trip" and return_flights and pairings and not (
+            st.session_state.get("selected_outbound") and st.session_state.get("selected_return")
+        ):
+            st.markdown("### 💡 Cheapest Round-trip Pairings")
+            for i, pairing in enumerate(pairings[:3]):
+                out_opt = outbound_flights["outbound_flights"][pairing["outbound_index"]]
+                ret_opt = return_flights[pairing["return_index"]]
+                total = pairing.get("total_price")
+                st.write(
+                    f"**Total:** {total if total is not None else 'N/A'}  |  "
+                    f"Out: {out_opt['airlines']} ({out_opt['duration']})  |  "
+                    f"Return: {ret_opt['airlines']} ({ret_opt['duration']})"
+                )
+                if st.button(f"Select Pairing {i+1}", key=f"sel_pair_{i}"):
+                    st.session_state.selected_outbound = out_opt
+                    st.session_state.selected_return = ret_opt
+                    st.rerun()
+            st.markdown("---")
+
         # ---- Outbound Selection ----
         sel_out = st.session_state.get("selected_outbound")
         if sel_out:
@@ -567,7 +618,7 @@ with tab_trip:
                     st.rerun()
             else:
                 st.markdown("### Return Flights")
-                for i, opt in enumerate(return_flights["outbound_flights"]):
+                for i, opt in enumerate(return_flights):
                     _display_flight_card(opt)
                     if st.button(f"Select Return {i+1}", key=f"sel_ret_{i}"):
                         st.session_state.selected_return = opt
@@ -638,28 +689,39 @@ with tab_trip:
                         max_retries = 3
                         for attempt in range(max_retries):
                             try:
-                                # Call the trips/plan endpoint
-                                response = requests.post(
-                                    f"{API_URL}/trips/plan",
-                                    json={
-                                        "destination": destination_t,
-                                        "departure_date": departure_date_str,
-                                        "return_date": return_date_str if trip_type == "Round-trip" else None,
-                                        "stay_nights": stay_nights if trip_type == "One-way" else None,
-                                        "flight": {
-                                            "outbound": outbound,
-                                            "return": st.session_state.get("selected_return") if trip_type == "Round-trip" else None
-                                        },
-                                        "hotel": hotel,
-                                        "interests": interests_list,
-                                        "trip_style": trip_style.lower(),
-                                        "budget_level": budget_level.lower()
+                                plan_payload = {
+                                    "destination": destination_t,
+                                    "departure_date": departure_date_str,
+                                    "return_date": return_date_str if trip_type == "Round-trip" else None,
+                                    "stay_nights": stay_nights if trip_type == "One-way" else None,
+                                    "flight": {
+                                        "outbound": outbound,
+                                        "return": st.session_state.get("selected_return") if trip_type == "Round-trip" else None
                                     },
-                                    timeout=30  # Longer timeout for itinerary generation
-                                )
+                                    "hotel": hotel,
+                                    "interests": interests_list,
+                                    "trip_style": trip_style.lower(),
+                                    "budget_level": budget_level.lower()
+                                }
                                 
-                                if response.status_code == 200:
-                                    trip_data = response.json()
+                                if STREAM_ITINERARY:
+                                    # Show tokens as they arrive, then render the full plan below
+                                    trip_data, error_text, started = stream_trip_plan(plan_payload, st.empty())
+                                    if trip_data is None and started:
+                                        # The stream failed part-way: retrying would rerun the whole generation
+                                        st.error(f"Error generating itinerary: {error_text}")
+                                        break
+                                else:
+                                    # Call the trips/plan endpoint
+                                    response = requests.post(
+                                        f"{API_URL}/trips/plan",
+                                        json=plan_payload,
+                                        timeout=30  # Longer timeout for itinerary generation
+                                    )
+                                    trip_data = response.json() if response.status_code == 200 else None
+                                    error_text = response.text
+                                
+                                if trip_data is not None:
                                     itinerary = trip_data.get("itinerary", "")
                                     highlights = trip_data.get("highlights", [])
                                     daily_plans = trip_data.get("daily_plans", [])
@@ -675,6 +737,16 @@ with tab_trip:
                                     else:
                                         st.info(f"Itinerary generated using {source}")
                                     
+                                    partial_sources = trip_data.get("partial_sources", [])
+                                    if partial_sources:
+                                        st.warning(f"Planned without {', '.join(partial_sources)} (source unavailable)")
+                                    timings = trip_data.get("timings", {})
+                                    if "ttft" in timings:
+                                        st.caption(
+                                            f"First words after {timings['ttft'] / 1000:.1f}s · "
+                                            f"complete plan in {timings.get('total', 0) / 1000:.1f}s"
+                                        )
+                                    
                                     # Highlights section
                                     if highlights:
                                         st.markdown("#### ✨ Trip Highlights")
@@ -745,7 +817,7 @@ with tab_trip:
                                 else:
                                     # Only show error on last retry attempt
                                     if attempt == max_retries - 1:
-                                        st.error(f"Error generating itinerary: {response.text}")
+                                        st.error(f"Error generating itinerary: {error_text}")
                                     time.sleep(2)  # Wait before retrying
                             
                             except requests.Timeout:
@@ -3,12 +3,19 @@ LLM Service for the Travel Explorer application.
 This module provides LLM integration for generating itineraries and other text content.
 """
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
-from serpapi import GoogleSearch
-from snowflake.snowpark import Session
-from snowflake.snowpark.functions import lower
+
+from backend.http_pool import build_timeout, get_client
+from backend.restaurant_snapshot import get_restaurant_snapshot
+from backend.response_cache import ResponseCache, build_cache, make_cache_key
+from backend.singleflight import SingleFlight
+from backend.snowflake_pool import SessionPool
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +24,12 @@ load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+# Default number of top-rated restaurants fetched per city (callers may pass their own limit)
+RESTAURANT_LIMIT = int(os.getenv("RESTAURANT_LIMIT", "20"))
+# Hard bounds (seconds) on the work behind a lookup, so a hung call frees its worker
+SERPAPI_URL = "https://serpapi.com/search.json"
+SERPAPI_TIMEOUT = float(os.getenv("SERPAPI_TIMEOUT", "10"))
+SNOWFLAKE_STATEMENT_TIMEOUT = int(os.getenv("SNOWFLAKE_STATEMENT_TIMEOUT", "20"))
 
 # Validation
 if not SERP_API_KEY:
@@ -26,74 +39,208 @@ if not OPENAI_API_KEY:
 
 # OpenAI client
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
-_snowflake_session = None
-# Snowflake setup
-def get_snowflake_session():
-    """Get or create a Snowflake session."""
-    global _snowflake_session
-    if _snowflake_session is None:
-        connection_parameters = {
-            "account": os.getenv("SNOWFLAKE_ACCOUNT"),
-            "user": os.getenv("SNOWFLAKE_USER"),
-            "password": os.getenv("SNOWFLAKE_PASSWORD"),
-            "role": os.getenv("SNOWFLAKE_ROLE", "ACCOUNTADMIN"),
-            "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE", "COMPUTE_WH"),
-            "database": "FINAL_PROJECT",
-            "schema": "MY_SCHEMA"
-        }
-        _snowflake_session = Session.builder.configs(connection_parameters).create()
-    return _snowflake_session
+# Snowflake setup (snowpark is imported on first use so the stack can run from a
+# restaurant snapshot without it; see backend.restaurant_snapshot)
+def create_snowflake_session():
+    """Open a new Snowflake session."""
+    from snowflake.snowpark import Session
+    
+    connection_parameters = {
+        "account": os.getenv("SNOWFLAKE_ACCOUNT"),
+        "user": os.getenv("SNOWFLAKE_USER"),
+        "password": os.getenv("SNOWFLAKE_PASSWORD"),
+        "role": os.getenv("SNOWFLAKE_ROLE", "ACCOUNTADMIN"),
+        "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE", "COMPUTE_WH"),
+        "database": "FINAL_PROJECT",
+        "schema": "MY_SCHEMA",
+        "session_parameters": {"STATEMENT_TIMEOUT_IN_SECONDS": SNOWFLAKE_STATEMENT_TIMEOUT}
+    }
+    return Session.builder.configs(connection_parameters).create()
+
+# Sessions are shared between request threads through a pool (SNOWFLAKE_POOL_* settings)
+snowflake_pool = SessionPool(create_snowflake_session)
+
+def snowflake_session():
+    """Borrow a pooled Snowflake session: `with snowflake_session() as session: ...`"""
+    return snowflake_pool.session()
 
 # Restaurant functions
-# Add a simple cache
-_restaurant_cache = {}
+# Bounded, expiring cache of restaurant rows per (city, limit); total cached rows are capped
+_restaurant_cache: Optional[ResponseCache] = None
+_restaurant_cache_lock = threading.Lock()
+
+def get_restaurant_cache() -> Optional[ResponseCache]:
+    """Return the shared restaurant cache, building it from env config on first use."""
+    global _restaurant_cache
+    with _restaurant_cache_lock:
+        if _restaurant_cache is None:
+            _restaurant_cache = build_cache(
+                "RESTAURANT", ttl=21600, maxsize=512, path="cache/restaurants.sqlite",
+                max_weight=20000, weigher=len,
+            )
+    return _restaurant_cache
+
+def _restaurant_key(city_key, limit):
+    return make_cache_key({"city": city_key, "limit": limit or "all"})
 
-def get_restaurants_from_snowflake(city):
-    """Get restaurants from Snowflake with caching."""
+def _restaurant_row(row):
+    return {"NAME": row["NAME"], "ADDRESS": row["ADDRESS"], "URL": row["URL"], "RATING": row["RATING"]}
+
+def get_restaurants_from_snowflake(city, limit: Optional[int] = RESTAURANT_LIMIT):
+    """
+    Get the top-rated restaurants for a city from Snowflake, with caching.
+    Sorting and the row limit run in Snowflake, so only `limit` rows cross
+    the network; pass limit=None to fetch every restaurant in the city.
+    Served from the local snapshot instead when RESTAURANT_SNAPSHOT_PATH is set.
+    """
     city_key = city.lower()
-    
+    cache = get_restaurant_cache()
+    key = _restaurant_key(city_key, limit)
+
     # Check cache first
-    if city_key in _restaurant_cache:
-        return _restaurant_cache[city_key]
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    
+    snapshot = get_restaurant_snapshot()
+    if snapshot is not None:
+        restaurants = snapshot.top(city_key, limit)
+        if cache is not None:
+            cache.set(key, restaurants)
+        return restaurants
     
     # Query Snowflake
-    session = get_snowflake_session()
-    df = session.table("YELP_RESTAURANTS")
-    results = (
-        df.filter(lower(df["CITY"]) == city_key)
-          .select("NAME", "ADDRESS", "URL", "RATING")
-          .collect()
-    )
+    from snowflake.snowpark.functions import col, lower
+    
+    def fetch(session):
+        df = session.table("YELP_RESTAURANTS")
+        query = (
+            df.filter(lower(df["CITY"]) == city_key)
+              .select("NAME", "ADDRESS", "URL", "RATING")
+              .sort(col("RATING").desc_nulls_last())
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.collect()
+    
+    results = snowflake_pool.run(fetch)
     
     # Convert to list of dictionaries
-    restaurants = []
-    for row in results:
-        restaurants.append({
-            "NAME": row["NAME"],
-            "ADDRESS": row["ADDRESS"],
-            "URL": row["URL"],
-            "RATING": row["RATING"]
-        })
+    restaurants = [_restaurant_row(row) for row in results]
     
     # Cache the results
-    _restaurant_cache[city_key] = restaurants
+    if cache is not None:
+        cache.set(key, restaurants)
     
     return restaurants
 
+def prefetch_restaurants(cities: Iterable[str], limits: Iterable[int] = (RESTAURANT_LIMIT,)) -> Dict[str, int]:
+    """
+    Warm the restaurant cache for many cities with one Snowflake query.
+    Ranks restaurants by rating within each city (CITY IN (...) plus a
+    ROW_NUMBER window), keeps the top max(limits) per city and stores a
+    cache entry for every (city, limit) pair, so get_restaurants_from_snowflake
+    hits the cache for all of them. Returns the number of rows cached per city.
+    """
+    cache = get_restaurant_cache()
+    city_keys = sorted({c.lower() for c in cities})
+    limits = sorted(set(limits))
+    if cache is None or not city_keys or not limits:
+        return {}
+
+    snapshot = get_restaurant_snapshot()
+    if snapshot is not None:
+        by_city = {c: snapshot.top(c, limits[-1]) for c in city_keys}
+    else:
+        by_city = _fetch_top_restaurants(city_keys, limits[-1])
+
+    for city_key, restaurants in by_city.items():
+        for limit in limits:
+            cache.set(_restaurant_key(city_key, limit), restaurants[:limit])
+    return {city_key: len(restaurants) for city_key, restaurants in by_city.items()}
+
+def _fetch_top_restaurants(city_keys, limit):
+    from snowflake.snowpark import Window
+    from snowflake.snowpark.functions import col, lower, row_number
+
+    def fetch(session):
+        df = session.table("YELP_RESTAURANTS")
+        city_col = lower(df["CITY"])
+        ranked = Window.partition_by(city_col).order_by(col("RATING").desc_nulls_last())
+        return (
+            df.filter(city_col.isin(city_keys))
+              .select(city_col.alias("CITY_KEY"), "NAME", "ADDRESS", "URL", "RATING",
+                      row_number().over(ranked).alias("RANK"))
+              .filter(col("RANK") <= limit)
+              .sort(col("CITY_KEY"), col("RANK"))
+              .collect()
+        )
+
+    results = snowflake_pool.run(fetch)
+
+    by_city: Dict[str, list] = {c: [] for c in city_keys}
+    for row in results:
+        by_city[row["CITY_KEY"]].append(_restaurant_row(row))
+    return by_city
+
+# Web lookups
+# "Top places/restaurants in X" rarely changes, so SerpAPI results are kept on disk
+# for a week by default (SERP_CACHE_* settings). Errors are never cached.
+_serp_cache: Optional[ResponseCache] = None
+_serp_cache_lock = threading.Lock()
+
+def get_serp_cache() -> Optional[ResponseCache]:
+    """Return the shared SerpAPI lookup cache, building it from env config on first use."""
+    global _serp_cache
+    with _serp_cache_lock:
+        if _serp_cache is None:
+            _serp_cache = build_cache(
+                "SERP", ttl=604800, maxsize=2048, path="cache/serpapi.sqlite", backend="sqlite"
+            )
+    return _serp_cache
+
+# Concurrent lookups for the same query share one SerpAPI call
+_serp_inflight = SingleFlight()
+
+def _cached_search(kind, city, params, extract):
+    """Run a SerpAPI search through the cache; raises on transport or API errors."""
+    key = make_cache_key({"kind": kind, "city": city.strip().lower()})
+    cache = get_serp_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    def fetch():
+        response = get_client(SERPAPI_URL).get(
+            SERPAPI_URL,
+            params={"engine": "google", **params, "api_key": SERP_API_KEY, "output": "json"},
+            timeout=build_timeout(read=SERPAPI_TIMEOUT),
+        )
+        results = response.json()
+        if "error" in results:
+            raise RuntimeError(results["error"])
+        response.raise_for_status()
+        items = extract(results)
+        if cache is not None:
+            cache.set(key, items)
+        return items
+
+    return _serp_inflight.do(key, fetch)
+
 def search_restaurants_from_web(city):
     """Search for restaurants from the web using SerpAPI."""
     try:
-        search = GoogleSearch({
-            "engine": "google_local",
-            "q": f"top restaurants in {city}",
-            "location": city,
-            "api_key": SERP_API_KEY
-        })
-        results = search.get_dict()
-        return [
-            f"{r.get('title', '')} - {r.get('address', '')} - Rating: {r.get('rating', '')}/5"
-            for r in results.get("local_results", [])[:5]
-        ]
+        return _cached_search(
+            "restaurants",
+            city,
+            {"engine": "google_local", "q": f"top restaurants in {city}", "location": city},
+            lambda results: [
+                f"{r.get('title', '')} - {r.get('address', '')} - Rating: {r.get('rating', '')}/5"
+                for r in results.get("local_results", [])[:5]
+            ],
+        )
     except Exception as e:
         return [f"SerpAPI Error: {e}"]
 
@@ -101,19 +248,65 @@ def search_restaurants_from_web(city):
 def search_places(city):
     """Search for places to visit using SerpAPI."""
     try:
-        search = GoogleSearch({
-            "q": f"Top places to visit in {city}",
-            "location": city,
-            "api_key": SERP_API_KEY
-        })
-        results = search.get_dict()
-        return [
-            f"{r.get('title', '')}: {r.get('snippet', '')}"
-            for r in results.get("organic_results", [])[:5]
-        ]
+        return _cached_search(
+            "places",
+            city,
+            {"q": f"Top places to visit in {city}", "location": city},
+            lambda results: [
+                f"{r.get('title', '')}: {r.get('snippet', '')}"
+                for r in results.get("organic_results", [])[:5]
+            ],
+        )
     except Exception as e:
         return [f"SerpAPI Error: {e}"]
 
+# Attractions (SerpAPI) and restaurants (Snowflake/snapshot) are independent lookups.
+# Each plan takes two workers, held for at most SERPAPI_TIMEOUT (plus connect) or
+# SNOWFLAKE_POOL_ACQUIRE_TIMEOUT + SNOWFLAKE_STATEMENT_TIMEOUT even when the caller
+# has stopped waiting, so size the pool for concurrent plans x 2 at that bound.
+_lookup_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LOOKUP_THREADPOOL_SIZE", "16")),
+                                      thread_name_prefix="lookup")
+
+def search_attractions_and_restaurants(city, restaurant_limit: Optional[int] = RESTAURANT_LIMIT):
+    """
+    Fetch attractions and restaurants for a city concurrently.
+    Returns (attractions, restaurants); an exception from either lookup is re-raised.
+    """
+    attractions = _lookup_executor.submit(search_places, city)
+    restaurants = _lookup_executor.submit(get_restaurants_from_snowflake, city, restaurant_limit)
+    return attractions.result(), restaurants.result()
+
+def run_lookups(
+    lookups: Dict[str, Callable[[], Any]], timeouts: Dict[str, float]
+) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, str]]:
+    """
+    Run named zero-argument lookups concurrently, each bounded by its own timeout
+    (seconds, measured from the start of the fan-out).
+    Returns (results, timings_ms, errors): a lookup that raised or timed out is
+    absent from results and described in errors. A timed-out lookup keeps running
+    in the background, bounded by SERPAPI_TIMEOUT / SNOWFLAKE_STATEMENT_TIMEOUT, so
+    its result can still reach the caches for the next request.
+    """
+    start = time.perf_counter()
+
+    def timed(fn):
+        value = fn()
+        return value, (time.perf_counter() - start) * 1000
+
+    futures = {name: _lookup_executor.submit(timed, fn) for name, fn in lookups.items()}
+    results, timings, errors = {}, {}, {}
+    for name, future in futures.items():
+        remaining = timeouts[name] - (time.perf_counter() - start)
+        try:
+            results[name], timings[name] = future.result(timeout=max(remaining, 0))
+        except FutureTimeout:
+            errors[name] = f"timed out after {timeouts[name]:g}s"
+            timings[name] = timeouts[name] * 1000
+        except Exception as e:
+            errors[name] = str(e)
+            timings[name] = (time.perf_counter() - start) * 1000
+    return results, timings, errors
+
 # Itinerary generation functions
 def generate_itinerary(city, attractions, restaurants, dep_date, return_date, flight_info, hotel_info):
     """
@@ -0,0 +1,117 @@
+# amenity_vocab.py
+
+import os
+import json
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL
+
+# Precomputed embeddings for the hotel amenity vocabulary.
+# <path>.npy holds one normalized float32 row per amenity; <path>.json maps amenity -> row
+# and records the model and backend that produced the rows.
+load_dotenv()
+AMENITY_VOCAB_PATH = os.getenv("AMENITY_VOCAB_PATH", "data/amenity_vocab")
+
+
+class AmenityVocab:
+    """Read-only amenity -> embedding table backed by a memory-mapped .npy file."""
+
+    def __init__(self, vectors: np.ndarray, rows: Dict[str, int],
+                 model: Optional[str] = None, backend: Optional[str] = None):
+        self.vectors = vectors
+        self.rows = rows
+        self.model = model
+        self.backend = backend
+
+    @classmethod
+    def load(cls, path: str = AMENITY_VOCAB_PATH) -> "AmenityVocab":
+        # mmap_mode="r" lets every worker process share the same page-cache pages
+        vectors = np.load(f"{path}.npy", mmap_mode="r")
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        # Files from before the model tag was recorded are a bare amenity -> row map
+        if "rows" not in meta:
+            return cls(vectors, meta)
+        return cls(vectors, meta["rows"], meta.get("model"), meta.get("backend"))
+
+    def matches(self, model: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> bool:
+        """True if the rows were built with the given embedding model and backend."""
+        return self.model == model and self.backend == backend
+
+    def get(self, amenity: str) -> Optional[np.ndarray]:
+        row = self.rows.get(amenity)
+        return None if row is None else self.vectors[row]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+_vocab: Optional[AmenityVocab] = None
+_vocab_loaded = False
+_vocab_lock = threading.Lock()
+
+
+def get_amenity_vocab() -> Optional[AmenityVocab]:
+    """
+    Return the shared vocabulary, or None if no vocabulary file has been built or it
+    was built with a different EMBEDDING_MODEL / EMBEDDING_BACKEND (amenities are then
+    embedded on the fly, so they stay comparable with freshly encoded strings).
+    """
+    global _vocab, _vocab_loaded
+    with _vocab_lock:
+        if not _vocab_loaded:
+            if os.path.exists(f"{AMENITY_VOCAB_PATH}.npy"):
+                vocab = AmenityVocab.load(AMENITY_VOCAB_PATH)
+                if vocab.matches():
+                    _vocab = vocab
+                    print(f"[amenity_vocab] Loaded {len(_vocab)} amenities from {AMENITY_VOCAB_PATH}.npy")
+                else:
+                    print(
+                        f"[amenity_vocab] Ignoring {AMENITY_VOCAB_PATH}.npy: built with "
+                        f"{vocab.model}/{vocab.backend}, expected {EMBEDDING_MODEL}/{EMBEDDING_BACKEND}; "
+                        f"rebuild with `python -m backend.amenity_vocab`"
+                    )
+            _vocab_loaded = True
+    return _vocab
+
+
+def build_vocab(amenities: List[str], embedder, path: str = AMENITY_VOCAB_PATH) -> int:
+    """
+    Embed the given amenity strings with a backend.embeddings.Embedder and write
+    <path>.npy / <path>.json, tagged with the embedder's model and backend.
+    Returns the vocabulary size. get_amenity_vocab ignores a vocabulary whose tag
+    does not match the running EMBEDDING_MODEL / EMBEDDING_BACKEND.
+    """
+    vocab = sorted(set(amenities))
+    vectors = embedder.encode(vocab, batch_size=256)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.save(f"{path}.npy", vectors.astype(np.float32))
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        meta = {
+            "model": EMBEDDING_MODEL,
+            "backend": embedder.name,
+            "rows": {a: i for i, a in enumerate(vocab)},
+        }
+        json.dump(meta, f, ensure_ascii=False)
+    return len(vocab)
+
+
+if __name__ == "__main__":
+    # Offline build step: python -m backend.amenity_vocab
+    from backend import hotel_search
+    from backend.embeddings import get_embedder
+    from backend.hotel_ingest import iter_index_vectors
+
+    amenities = [
+        a
+        for vector in iter_index_vectors(hotel_search.get_pinecone_index())
+        for a in (vector.metadata or {}).get("key_amenities", [])
+    ]
+    amenities += hotel_search.EXACT_AMENITIES
+    size = build_vocab(amenities, get_embedder())
+    print(f"Wrote {size} amenity embeddings to {AMENITY_VOCAB_PATH}.npy")
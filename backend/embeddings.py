@@ -0,0 +1,147 @@
+# embeddings.py
+
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Selectable sentence-embedding runtime for hotel search.
+# EMBEDDING_BACKEND=torch (default) uses sentence-transformers on PyTorch;
+# onnx / onnx-int8 run an exported copy of the same model on ONNX Runtime.
+load_dotenv()
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", f"data/onnx/{EMBEDDING_MODEL}")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = runtime default
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+
+
+class Embedder(ABC):
+    """Encodes texts to L2-normalized float32 vectors, one row per text."""
+
+    name = "base"
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Embed texts as a (len(texts), dim) float32 array."""
+
+
+class TorchEmbedder(Embedder):
+    name = "torch"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        if EMBEDDING_THREADS:
+            import torch
+            torch.set_num_threads(EMBEDDING_THREADS)
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size=64):
+        vectors = self.model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return vectors.astype(np.float32)
+
+
+class OnnxEmbedder(Embedder):
+    """Mean-pooled transformer embeddings on ONNX Runtime (CPU), matching sentence-transformers' output."""
+
+    def __init__(self, model_dir: str = EMBEDDING_ONNX_DIR, quantized: bool = False):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = os.path.join(model_dir, ONNX_INT8_FILE if quantized else ONNX_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run `python -m backend.embeddings export` first")
+
+        options = ort.SessionOptions()
+        if EMBEDDING_THREADS:
+            options.intra_op_num_threads = EMBEDDING_THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.name = "onnx-int8" if quantized else "onnx"
+
+    def encode(self, texts, batch_size=64):
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=256, return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            chunks.append(pooled.astype(np.float32))
+        return np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+
+def create_embedder(backend: str = EMBEDDING_BACKEND) -> Embedder:
+    if backend == "torch":
+        return TorchEmbedder()
+    if backend == "onnx":
+        return OnnxEmbedder(quantized=False)
+    if backend == "onnx-int8":
+        return OnnxEmbedder(quantized=True)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+_embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """Return the shared embedder for EMBEDDING_BACKEND, loading it on first use."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = create_embedder()
+    return _embedder
+
+
+def export_onnx(model_dir: str = EMBEDDING_ONNX_DIR, model_name: str = EMBEDDING_MODEL) -> None:
+    """Export the transformer to ONNX (fp32) plus a dynamically int8-quantized copy."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    hub_name = f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    model = AutoModel.from_pretrained(hub_name).eval()
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer.save_pretrained(model_dir)
+
+    sample = tokenizer(["hotels in boston"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {"batch": 0, "sequence": 1}
+    fp32_path = os.path.join(model_dir, ONNX_FILE)
+    torch.onnx.export(
+        model,
+        tuple(sample[n] for n in names),
+        fp32_path,
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={**{n: dynamic for n in names}, "last_hidden_state": dynamic},
+        opset_version=14,
+    )
+    quantize_dynamic(fp32_path, os.path.join(model_dir, ONNX_INT8_FILE), weight_type=QuantType.QInt8)
+
+
+if __name__ == "__main__":
+    # Build the ONNX runtimes: python -m backend.embeddings export
+    if sys.argv[1:] != ["export"]:
+        print("Usage: python -m backend.embeddings export")
+        sys.exit(1)
+    export_onnx()
+    print(f"Exported {EMBEDDING_MODEL} to {EMBEDDING_ONNX_DIR}/{{{ONNX_FILE},{ONNX_INT8_FILE}}}")
@@ -1,27 +1,80 @@
 # flight_search.py
 
 import os
-import requests
 import json
+import asyncio
+import threading
 from dotenv import load_dotenv
-from typing import Optional, Union, Dict, Any, List
+from typing import Optional, Union, Dict, Any, List, Coroutine
+
+from backend.http_pool import get_async_client
+from backend.response_cache import ResponseCache, build_cache, make_cache_key
+from backend.singleflight import SingleFlight
 
 # Load environment variables (including SERP API key)
 load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 
+# Concurrent identical leg fetches share one SerpAPI call
+_inflight = SingleFlight()
+
+# Shared cache of raw one-way responses (FLIGHT_CACHE_BACKEND=memory|sqlite|none)
+_flight_cache: Optional[ResponseCache] = None
+_flight_cache_lock = threading.Lock()
+
+
+def get_flight_cache() -> Optional[ResponseCache]:
+    """Return the shared flight response cache, building it from env config on first use."""
+    global _flight_cache
+    with _flight_cache_lock:
+        if _flight_cache is None:
+            _flight_cache = build_cache("FLIGHT", ttl=900, maxsize=1024, path="cache/flights.sqlite")
+    return _flight_cache
+
+
+# Background event loop that drives the async engine for sync callers
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_engine_lock = threading.Lock()
+
+
+def _get_engine_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="flight-search-engine", daemon=True
+            ).start()
+            _engine_loop = loop
+    return _engine_loop
+
+
+def _run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the engine loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_engine_loop()).result()
+
 
 class FlightDataExtractor:
     """
     Search Google Flights via SerpAPI as two one-way calls when return_date is given,
     then stitch outbound and return legs together.
+
+    The HTTP work is done by an async (httpx) engine so both legs are fetched
+    concurrently; search_flights is the sync API and asearch_flights the async one.
     """
 
-    def __init__(self, api_key: str, base_url: str = "https://serpapi.com/search.json"):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://serpapi.com/search.json",
+        cache: Optional[ResponseCache] = None
+    ):
         self.api_key = api_key
         self.base_url = base_url
+        self.cache = cache if cache is not None else get_flight_cache()
 
-    def _raw_one_way(
+    def _build_params(
         self,
         origin: str,
         destination: str,
@@ -38,11 +91,11 @@ class FlightDataExtractor:
         gl: str,
         **advanced_filters
     ) -> Dict[str, Any]:
-        """Internal: fetch raw JSON for a single one-way leg."""
+        """Internal: SerpAPI query parameters for a single one-way leg."""
         params = {
             "engine":          "google_flights",
-            "departure_id":    origin,
-            "arrival_id":      destination,
+            "departure_id":    origin.strip().upper(),
+            "arrival_id":      destination.strip().upper(),
             "outbound_date":   date,
             "type":            2,  # one-way
             "deep_search":     deep_search,
@@ -58,14 +111,38 @@ class FlightDataExtractor:
             "api_key":         self.api_key,
         }
         params.update(advanced_filters)
-        resp = requests.get(self.base_url, params=params)
+        return params
+
+    async def _araw_one_way(self, *args, **kwargs) -> Dict[str, Any]:
+        """Internal: fetch raw JSON for a single one-way leg (async)."""
+        params = self._build_params(*args, **kwargs)
+        key = make_cache_key(params)
+        # The cache may be SQLite-backed; keep its disk I/O off the event loop
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        data = await _inflight.ado(key, self._afetch, params)
+
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, key, data)
+        return data
+
+    async def _afetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Internal: issue the SerpAPI request for one leg."""
+        resp = await get_async_client(self.base_url).get(self.base_url, params=params)
         resp.raise_for_status()
         data = resp.json()
         if "error" in data:
             raise RuntimeError(data["error"])
         return data
 
-    def search_flights(
+    def _raw_one_way(self, *args, **kwargs) -> Dict[str, Any]:
+        """Internal: fetch raw JSON for a single one-way leg."""
+        return _run_sync(self._araw_one_way(*args, **kwargs))
+
+    async def asearch_flights(
         self,
         origin: str,
         destination: str,
@@ -84,31 +161,54 @@ class FlightDataExtractor:
         **advanced_filters
     ) -> Dict[str, Any]:
         """
-        If return_date is provided, do two one-way searches:
-        1) origin -> destination on departure_date
-        2) destination -> origin on return_date
+        Async variant of search_flights. When return_date is provided the
+        outbound and return legs are fetched at the same time.
         """
-        outbound_raw = self._raw_one_way(
-            origin, destination, departure_date,
+        common = (
             deep_search, travel_class, adults, children,
-            infants_in_seat, infants_on_lap, stops, sort_by,
-            hl, gl, **advanced_filters
+            infants_in_seat, infants_on_lap, stops, sort_by, hl, gl
         )
-
-        return_raw = None
+        legs = [self._araw_one_way(origin, destination, departure_date, *common, **advanced_filters)]
         if return_date:
-            return_raw = self._raw_one_way(
-                destination, origin, return_date,
-                deep_search, travel_class, adults, children,
-                infants_in_seat, infants_on_lap, stops, sort_by,
-                hl, gl, **advanced_filters
-            )
+            legs.append(self._araw_one_way(destination, origin, return_date, *common, **advanced_filters))
+
+        results = await asyncio.gather(*legs)
 
         return {
-            "outbound_raw": outbound_raw,
-            "return_raw":   return_raw
+            "outbound_raw": results[0],
+            "return_raw":   results[1] if return_date else None
         }
 
+    def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        deep_search: bool = False,
+        travel_class: int = 1,
+        adults: int = 1,
+        children: int = 0,
+        infants_in_seat: int = 0,
+        infants_on_lap: int = 0,
+        stops: int = 0,
+        sort_by: int = 1,
+        hl: str = "en",
+        gl: str = "us",
+        **advanced_filters
+    ) -> Dict[str, Any]:
+        """
+        If return_date is provided, do two one-way searches concurrently:
+        1) origin -> destination on departure_date
+        2) destination -> origin on return_date
+        """
+        return _run_sync(self.asearch_flights(
+            origin, destination, departure_date, return_date,
+            deep_search, travel_class, adults, children,
+            infants_in_seat, infants_on_lap, stops, sort_by,
+            hl, gl, **advanced_filters
+        ))
+
     def extract_important_flight_info(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse the paired raw JSON into structured outbound_flights and return_flights.
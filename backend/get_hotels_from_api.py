@@ -1,14 +1,21 @@
 # get_hotels_from_api.py
 
 import os
-import requests
+import httpx
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
+from backend.http_pool import get_client
+from backend.response_cache import make_cache_key
+from backend.singleflight import SingleFlight
+
 load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 
+# Concurrent identical hotel searches share one SerpAPI call
+_inflight = SingleFlight()
+
 
 class HotelDataExtractor:
     def __init__(self, api_key: str = SERP_API_KEY, base_url: str = "https://serpapi.com/search"):
@@ -32,11 +39,14 @@ class HotelDataExtractor:
             "gl": "us",
             "api_key": self.api_key
         }
+        return _inflight.do(make_cache_key(params), self._fetch, params)
+
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            resp = requests.get(self.base_url, params=params)
+            resp = get_client(self.base_url).get(self.base_url, params=params)
             resp.raise_for_status()
             return resp.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"[HotelDataExtractor] Request failed: {e}")
             return {}
 
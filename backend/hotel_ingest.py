@@ -0,0 +1,102 @@
+# hotel_ingest.py
+
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Typed metadata fields used for Pinecone-side filtering in query_hotels.
+# The display fields ("city", "rating" like "4.2/5", price strings like "$1,234")
+# are kept untouched; these are added alongside them.
+CITY_FIELD = "city_key"
+RATING_FIELD = "rating_value"
+PRICE_FIELD = "price_nightly_value"
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_rating(value: Any) -> Optional[float]:
+    """'4.2/5' -> 4.2, 4.2 -> 4.2, anything unparseable -> None."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group()) if match else None
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """'$1,234' -> 1234.0, 1234 -> 1234.0, anything unparseable -> None."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def typed_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Numeric/normalized filter fields derived from a hotel's display metadata."""
+    typed: Dict[str, Any] = {}
+    if metadata.get("city"):
+        typed[CITY_FIELD] = str(metadata["city"]).strip().lower()
+    rating = parse_rating(metadata.get("rating"))
+    if rating is not None:
+        typed[RATING_FIELD] = rating
+    price = metadata.get("price")
+    nightly = parse_price(price.get("nightly") if isinstance(price, dict) else price)
+    if nightly is not None:
+        typed[PRICE_FIELD] = nightly
+    return typed
+
+
+def build_filter(city: str, rating: Optional[float] = None, max_price: Optional[float] = None) -> Dict[str, Any]:
+    """Pinecone metadata filter equivalent to query_hotels' city/rating/price checks."""
+    flt: Dict[str, Any] = {CITY_FIELD: {"$eq": city.strip().lower()}}
+    if rating:
+        flt[RATING_FIELD] = {"$gte": float(rating)}
+    if max_price:
+        # Like query_hotels, keep hotels without a parseable nightly price
+        flt["$or"] = [{PRICE_FIELD: {"$lte": float(max_price)}}, {PRICE_FIELD: {"$exists": False}}]
+    return flt
+
+
+def iter_index_vectors(index, batch_size: int = 100) -> Iterator[Any]:
+    """Yield every vector (id, values, metadata) stored in a Pinecone index."""
+    for ids in index.list(limit=batch_size):
+        fetched = index.fetch(ids=list(ids))
+        yield from fetched.vectors.values()
+
+
+def upsert_hotels(records: Iterable[Tuple[str, List[float], Dict[str, Any]]], index, batch_size: int = 100) -> int:
+    """
+    Upsert (id, vector, metadata) records, adding the typed filter fields to
+    each metadata dict. Returns the number of records written.
+    """
+    batch, written = [], 0
+    for hotel_id, vector, metadata in records:
+        batch.append({"id": hotel_id, "values": vector, "metadata": {**metadata, **typed_metadata(metadata)}})
+        if len(batch) >= batch_size:
+            index.upsert(vectors=batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        index.upsert(vectors=batch)
+        written += len(batch)
+    return written
+
+
+def backfill_typed_metadata(index) -> int:
+    """Add the typed filter fields to vectors already in the index. Returns the number updated."""
+    updated = 0
+    for vector in iter_index_vectors(index):
+        typed = typed_metadata(vector.metadata or {})
+        if typed and any((vector.metadata or {}).get(k) != v for k, v in typed.items()):
+            index.update(id=vector.id, set_metadata=typed)
+            updated += 1
+    return updated
+
+
+if __name__ == "__main__":
+    # One-off migration for an existing index: python -m backend.hotel_ingest backfill
+    from backend.hotel_search import get_pinecone_index
+
+    if sys.argv[1:] != ["backfill"]:
+        print("Usage: python -m backend.hotel_ingest backfill")
+        sys.exit(1)
+    print(f"Updated typed metadata on {backfill_typed_metadata(get_pinecone_index())} vectors")
@@ -1,10 +1,21 @@
 #hotel_search.py
 import os
 import sys
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
 from dotenv import load_dotenv
-from pinecone import Pinecone
-from sentence_transformers import SentenceTransformer, util
+
+from backend.amenity_vocab import get_amenity_vocab
+from backend.embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL, get_embedder
+from backend.hotel_ingest import CITY_FIELD, build_filter
+from backend.vector_store import (
+    HOTEL_VECTOR_BACKEND, HOTEL_VECTOR_SNAPSHOT,
+    LocalVectorStore, PineconeVectorStore, VectorStore,
+)
+from backend.response_cache import ResponseCache, build_cache, make_cache_key
+from backend.singleflight import SingleFlight
 
 # Fix encoding for Windows console
 sys.stdout.reconfigure(encoding='utf-8')
@@ -16,13 +27,119 @@ load_dotenv()
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV", "us-east-1")
 INDEX_NAME = "hotels-index"
+AMENITY_CACHE_SIZE = int(os.getenv("AMENITY_CACHE_SIZE", "4096"))
+# Filter on typed city/rating/price metadata in Pinecone (see backend.hotel_ingest)
+HOTEL_METADATA_FILTER = os.getenv("HOTEL_METADATA_FILTER", "true").lower() in ("1", "true", "yes")
+
+# Amenities that must match exactly (case-insensitive) rather than semantically
+EXACT_AMENITIES = {"pet-friendly", "kid-friendly", "child-friendly", "airport shuttle", "free breakfast"}
+
+# The embedder (backend.embeddings.get_embedder) and vector store are created on first
+# use so importing this module stays cheap for workers that never search hotels.
+_index = None
+_store = None
+_init_lock = threading.Lock()
+
+def get_pinecone_index():
+    """Return the shared Pinecone index handle, connecting on first use."""
+    global _index
+    if _index is None:
+        with _init_lock:
+            if _index is None:
+                from pinecone import Pinecone
+                _index = Pinecone(api_key=PINECONE_API_KEY).Index(INDEX_NAME)
+    return _index
+
+def get_vector_store() -> VectorStore:
+    """Return the hotel vector store selected by HOTEL_VECTOR_BACKEND (pinecone | local)."""
+    global _store
+    if _store is None:
+        if HOTEL_VECTOR_BACKEND == "local":
+            with _init_lock:
+                if _store is None:
+                    _store = LocalVectorStore.load(HOTEL_VECTOR_SNAPSHOT)
+        elif HOTEL_VECTOR_BACKEND == "pinecone":
+            index = get_pinecone_index()
+            with _init_lock:
+                if _store is None:
+                    _store = PineconeVectorStore(index)
+        else:
+            raise ValueError(f"Unknown HOTEL_VECTOR_BACKEND: {HOTEL_VECTOR_BACKEND}")
+    return _store
+
+def warm_up() -> None:
+    """Load the model, open the vector store and map the amenity vocabulary ahead of the first request."""
+    get_embedder().encode(["warm up"])
+    get_vector_store()
+    get_amenity_vocab()
+
+# Concurrent identical searches share one embedding + Pinecone query
+_inflight = SingleFlight()
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(INDEX_NAME)
+# Query string -> embedding cache (QUERY_EMBEDDING_CACHE_BACKEND=memory|sqlite|none)
+_query_cache: Optional[ResponseCache] = None
+_query_cache_lock = threading.Lock()
+
+def get_query_embedding_cache() -> Optional[ResponseCache]:
+    """Return the shared query-embedding cache, building it from env config on first use."""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = build_cache(
+                "QUERY_EMBEDDING", ttl=86400, maxsize=2048, path="cache/query_embeddings.sqlite"
+            )
+    return _query_cache
 
 def get_embedding(text: str) -> List[float]:
-    return model.encode([text])[0].tolist()
+    cache = get_query_embedding_cache()
+    if cache is None:
+        return get_embedder().encode([text])[0].tolist()
+
+    # Keyed on the exact text that is embedded: folding case is only safe for an uncased model.
+    # Runtimes differ slightly (int8 especially), so each backend keeps its own entries.
+    text = text.strip()
+    key = make_cache_key({"model": EMBEDDING_MODEL, "backend": EMBEDDING_BACKEND, "text": text})
+    embedding = cache.get(key)
+    if embedding is None:
+        embedding = get_embedder().encode([text])[0].tolist()
+        cache.set(key, embedding)
+    return embedding
+
+# LRU table of normalized amenity embeddings, shared across requests
+_amenity_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_amenity_lock = threading.Lock()
+
+def embed_amenities(amenities: List[str]) -> np.ndarray:
+    """
+    Normalized embeddings for amenity strings, one row per input.
+    Rows come from the precomputed vocabulary when available, then from the
+    LRU table; anything left is encoded together in one batch.
+    """
+    unique = list(dict.fromkeys(amenities))
+    found = {}
+    vocab = get_amenity_vocab()
+    if vocab is not None:
+        for a in unique:
+            row = vocab.get(a)
+            if row is not None:
+                found[a] = row
+
+    with _amenity_lock:
+        for a in unique:
+            if a not in found and a in _amenity_vectors:
+                _amenity_vectors.move_to_end(a)
+                found[a] = _amenity_vectors[a]
+
+    missing = [a for a in unique if a not in found]
+    if missing:
+        vectors = get_embedder().encode(missing)
+        with _amenity_lock:
+            for a, v in zip(missing, vectors):
+                found[a] = _amenity_vectors[a] = v
+            while len(_amenity_vectors) > AMENITY_CACHE_SIZE:
+                _amenity_vectors.popitem(last=False)
+
+    return np.stack([found[a] for a in amenities])
 
 def fuzzy_match(user_amenities: List[str], hotel_amenities: List[str], threshold: float = 0.7) -> bool:
     if not user_amenities:
@@ -30,16 +147,73 @@ def fuzzy_match(user_amenities: List[str], hotel_amenities: List[str], threshold
     if not hotel_amenities:
         return False
 
-    user_embeds = model.encode(user_amenities, convert_to_tensor=True)
-    hotel_embeds = model.encode(hotel_amenities, convert_to_tensor=True)
-    cosine_scores = util.cos_sim(user_embeds, hotel_embeds)
+    cosine_scores = embed_amenities(user_amenities) @ embed_amenities(hotel_amenities).T
+    return bool((cosine_scores.max(axis=1) >= threshold).all())
 
-    for i in range(len(user_amenities)):
-        if cosine_scores[i].max().item() < threshold:
-            return False
-    return True
+def filter_by_amenities(hotels: List[Dict[str, Any]], amenities: List[str], threshold: float = 0.7) -> List[Dict[str, Any]]:
+    """
+    Keep hotels whose key_amenities satisfy every requested amenity.
+    Exact amenities are compared case-insensitively; the rest are matched
+    semantically with one similarity matrix over all candidate amenities.
+    """
+    exact = [a.lower() for a in amenities if a.lower() in EXACT_AMENITIES]
+    fuzzy = [a for a in amenities if a.lower() not in EXACT_AMENITIES]
+
+    candidates = []
+    for hotel in hotels:
+        hotel_amenities = hotel.get("key_amenities", [])
+        lowered = {h.lower() for h in hotel_amenities}
+        if all(a in lowered for a in exact):
+            candidates.append(hotel)
+
+    if not fuzzy or not candidates:
+        return candidates
+
+    vocab = list(dict.fromkeys(h for hotel in candidates for h in hotel.get("key_amenities", [])))
+    if not vocab:
+        return []
+    column = {h: i for i, h in enumerate(vocab)}
+
+    # (user amenities x candidate vocabulary) cosine similarities
+    scores = embed_amenities(fuzzy) @ embed_amenities(vocab).T
+
+    matched = []
+    for hotel in candidates:
+        cols = [column[h] for h in hotel.get("key_amenities", [])]
+        if cols and (scores[:, cols].max(axis=1) >= threshold).all():
+            matched.append(hotel)
+    return matched
+
+# Whether the index carries the typed filter fields; checked once per process
+_typed_metadata: Optional[bool] = None
+
+def index_has_typed_metadata(vector) -> bool:
+    """
+    One-time probe for vectors with the typed filter fields. Until the index is
+    backfilled (python -m backend.hotel_ingest backfill) queries fall back to
+    filtering in Python; restart after backfilling to switch to metadata filters.
+    """
+    global _typed_metadata
+    if _typed_metadata is None:
+        response = get_vector_store().query(
+            vector=vector, top_k=1, include_metadata=False, filter={CITY_FIELD: {"$exists": True}}
+        )
+        _typed_metadata = bool(response["matches"])
+        if not _typed_metadata:
+            print("[hotel_search] Index has no typed filter fields; filtering in Python until it is backfilled")
+    return _typed_metadata
 
 def query_hotels(city: str, rating: float = None, max_price: float = None, amenities: List[str] = None, top_k: int = 100):
+    key = make_cache_key({
+        "city": city.lower(),
+        "rating": rating,
+        "max_price": max_price,
+        "amenities": sorted(a.lower() for a in amenities or []),
+        "top_k": top_k,
+    })
+    return _inflight.do(key, _query_hotels, city, rating, max_price, amenities, top_k)
+
+def _query_hotels(city: str, rating: float, max_price: float, amenities: List[str], top_k: int):
     query_str = f"hotels in {city}"
     if rating:
         query_str += f" with rating >= {rating}"
@@ -49,7 +223,18 @@ def query_hotels(city: str, rating: float = None, max_price: float = None, ameni
         query_str += f" with amenities: {', '.join(amenities)}"
 
     vector = get_embedding(query_str)
-    response = index.query(vector=vector, top_k=top_k, include_metadata=True)
+
+    if HOTEL_METADATA_FILTER and index_has_typed_metadata(vector):
+        response = get_vector_store().query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            filter=build_filter(city, rating, max_price)
+        )
+        results = [match["metadata"] for match in response["matches"]]
+        return filter_by_amenities(results, amenities) if amenities else results
+
+    response = get_vector_store().query(vector=vector, top_k=top_k, include_metadata=True)
 
     def filter_result(metadata):
         try:
@@ -66,19 +251,11 @@ def query_hotels(city: str, rating: float = None, max_price: float = None, ameni
                 if price_str and float(price_str) > max_price:
                     return False
 
-            if amenities:
-                hotel_amenities = metadata.get("key_amenities", [])
-                # Exact-match filtering
-                for a in amenities:
-                    if a.lower() in ["pet-friendly", "kid-friendly", "child-friendly", "airport shuttle", "free breakfast"]:
-                        if not any(a.lower() == h.lower() for h in hotel_amenities):
-                            return False
-                    else:
-                        if not fuzzy_match([a], hotel_amenities):
-                            return False
-
             return True
         except Exception:
             return False
 
-    return [match["metadata"] for match in response["matches"] if filter_result(match["metadata"])]
+    results = [match["metadata"] for match in response["matches"] if filter_result(match["metadata"])]
+    if amenities:
+        results = filter_by_amenities(results, amenities)
+    return results
@@ -0,0 +1,88 @@
+# http_pool.py
+
+import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+
+# Shared keep-alive connection pools for outbound HTTP (SerpAPI, MCP server).
+# One client per host, so each host gets its own connection limit.
+load_dotenv()
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def build_timeout(read: Optional[float] = None, connect: Optional[float] = None) -> httpx.Timeout:
+    """Explicit connect/read timeouts, defaulting to the configured values."""
+    read = HTTP_READ_TIMEOUT if read is None else read
+    connect = HTTP_CONNECT_TIMEOUT if connect is None else connect
+    return httpx.Timeout(read, connect=connect)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client(url: str) -> httpx.Client:
+    """Return the shared sync client (connection pool) for the host of url."""
+    key = _host_key(url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(timeout=build_timeout(), limits=_limits())
+            _clients[key] = client
+    return client
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """
+    Return the shared async client for the host of url.
+    Async connections are bound to an event loop, so pools are kept per running loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = _host_key(url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=build_timeout(), limits=_limits())
+            clients[key] = client
+    return client
+
+
+def close_clients() -> None:
+    """Close all shared sync clients."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    """Close the shared async clients that belong to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+    for client in clients:
+        await client.aclose()
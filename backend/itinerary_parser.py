@@ -0,0 +1,141 @@
+# itinerary_parser.py
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Structured fields from a generated itinerary, read in one pass over its lines.
+# Each line is classified once against the patterns below: a day header starts a
+# new day, a time-of-day or meal label switches the slot that following lines
+# belong to, and a highlights heading collects the bullets under it.
+
+SLOTS = ("morning", "afternoon", "evening", "breakfast", "lunch", "dinner")
+_SLOT_ALIASES = {"midday": "afternoon", "night": "evening"}
+
+# Leading markdown/list markup such as "## ", "**", "- ", "1. "
+_MARKUP = r"[\s#>*_\-•]*(?:\d+\.\s*)?[*_]*\s*"
+_LINE = re.compile(
+    rf"^{_MARKUP}(?:"
+    r"(?P<day>day\s+(?P<num>\d+))\b"
+    # An optional time range such as "(9:00 AM - 12:00 PM)" belongs to the label
+    r"|(?P<slot>morning|afternoon|midday|evening|night|breakfast|lunch|dinner)\b(?:[\s*_]*\([^)\n]*\))?"
+    r"|(?P<highlights>(?:(?:key|trip|top)\s+)?highlights)\b"
+    r")(?P<rest>.*)$",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[•\-\*]|\d+\.)\s+(.*)$")
+# Any other section header, e.g. "**Getting Around:**" or "Estimated Costs:"; ends the highlights
+_SECTION_HEADER = re.compile(r"^\s*(?:\*\*[^*]+\*\*|__[^_]+__|[A-Z][^:.!?*\n]{0,60}:)\s*:?\s*$")
+_LABEL_PUNCT = " \t:*_-–—"
+
+# Keywords that raise a cost category above the budget-level baseline. Plain
+# substring checks on the lowercased line: far cheaper than a case-insensitive
+# regex alternation tried at every position
+COST_SIGNALS = {
+    "luxury": ("luxury", "five-star", "5-star", "high-end", "gourmet", "exclusive"),
+    "activities": ("museum", "theater", "show", "concert", "tour", "guide"),
+    "transportation": ("taxi", "uber", "lyft", "car service", "private"),
+}
+# Fallbacks when there is no highlights section; the keyword tuples gate the regexes
+_HIGHLIGHT_WORDS = ("must-see", "highlight", "don't miss", "famous", "popular", "renowned")
+_HIGHLIGHT_PHRASE = re.compile(rf"(?:{'|'.join(_HIGHLIGHT_WORDS)}).*?([\w\s']+)(?:\.|\,)", re.IGNORECASE)
+_VISIT_WORDS = ("visit", "explore", "see")
+_VISIT_PHRASE = re.compile(rf"(?:{'|'.join(_VISIT_WORDS)}).*?([\w\s']+)(?:\.|\,)", re.IGNORECASE)
+
+MAX_HIGHLIGHTS = 5
+
+BASE_COSTS = {
+    "budget": {"accommodation": 75, "food": 40, "activities": 30, "transportation": 20},
+    "medium": {"accommodation": 150, "food": 80, "activities": 60, "transportation": 40},
+    "luxury": {"accommodation": 300, "food": 150, "activities": 120, "transportation": 80},
+}
+
+
+def parse_itinerary(itinerary: str) -> Dict[str, Any]:
+    """
+    Read daily plans, highlights and cost signals from itinerary text.
+    Returns {"daily_plans": [...], "highlights": [...], "cost_signals": {...}}.
+    """
+    days: List[Dict[str, List[str]]] = []
+    day_nums: List[int] = []
+    slot: Optional[List[str]] = None
+    in_highlights = False
+    bullets: List[str] = []
+    section_lines: List[str] = []
+    phrases: List[str] = []
+    visits: List[str] = []
+    signals = set()
+
+    for line in itinerary.splitlines():
+        lowered = line.lower()
+        if len(signals) < len(COST_SIGNALS):
+            for signal, keywords in COST_SIGNALS.items():
+                if signal not in signals and any(k in lowered for k in keywords):
+                    signals.add(signal)
+        if len(phrases) < MAX_HIGHLIGHTS and any(w in lowered for w in _HIGHLIGHT_WORDS):
+            phrases.extend(_HIGHLIGHT_PHRASE.findall(line))
+        if len(visits) < MAX_HIGHLIGHTS and any(w in lowered for w in _VISIT_WORDS):
+            visits.extend(_VISIT_PHRASE.findall(line))
+
+        match = _LINE.match(line)
+        if match and match.group("day"):
+            in_highlights = False
+            days.append({name: [] for name in SLOTS})
+            day_nums.append(int(match.group("num")))
+            slot = None
+            continue
+        if match and match.group("highlights") and not days:
+            in_highlights = True
+            rest = match.group("rest").strip(_LABEL_PUNCT)
+            if rest:
+                section_lines.append(rest)
+            continue
+        if line.lstrip().startswith("#") or (in_highlights and _SECTION_HEADER.match(line)):
+            # Any other heading ends the current section
+            in_highlights = False
+            slot = None
+            continue
+
+        if in_highlights:
+            bullet = _BULLET.match(line)
+            if bullet:
+                bullets.append(bullet.group(1).strip())
+            elif line.strip():
+                section_lines.append(line.strip())
+        elif days:
+            if match and match.group("slot"):
+                name = match.group("slot").lower()
+                slot = days[-1][_SLOT_ALIASES.get(name, name)]
+                line = match.group("rest").lstrip(_LABEL_PUNCT)
+            if slot is not None:
+                slot.append(line)
+
+    daily_plans = [
+        {"day": num, **{name: "\n".join(day[name]).strip() for name in SLOTS}}
+        for num, day in zip(day_nums, days)
+    ]
+
+    highlights = bullets or section_lines
+    if not highlights:
+        highlights = [p.strip() for p in phrases[:MAX_HIGHLIGHTS]]
+    if not highlights:
+        highlights = [v.strip() for v in visits[:MAX_HIGHLIGHTS] if len(v.strip()) > 3]
+
+    return {
+        "daily_plans": daily_plans,
+        "highlights": highlights[:MAX_HIGHLIGHTS],
+        "cost_signals": signals,
+    }
+
+
+def costs_for(budget_level: str, cost_signals) -> Dict[str, float]:
+    """Daily cost estimate for a budget level, adjusted by the signals parse_itinerary found."""
+    costs = dict(BASE_COSTS.get(budget_level.lower(), BASE_COSTS["medium"]))
+    if "luxury" in cost_signals:
+        costs["accommodation"] *= 1.2
+        costs["food"] *= 1.2
+    if "activities" in cost_signals:
+        costs["activities"] *= 1.15
+    if "transportation" in cost_signals:
+        costs["transportation"] *= 1.3
+    return costs
+
@@ -0,0 +1,254 @@
+# response_cache.py
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def make_cache_key(params: Dict[str, Any], exclude: Iterable[str] = ("api_key",)) -> str:
+    """
+    Stable key for a request parameter set: credentials are dropped, string
+    values are stripped, and keys are sorted before hashing.
+    """
+    skip = set(exclude)
+    normalized = {
+        k: (v.strip() if isinstance(v, str) else v)
+        for k, v in params.items()
+        if k not in skip and v is not None
+    }
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for TTL + LRU response caches. Subclasses implement _get/_set/_clear/_size;
+    hit/miss accounting lives here so every backend reports the same stats.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self).__name__,
+                "size": self._size(),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                **self._extra_stats(),
+            }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        """Return the live value for key, or None if missing or expired."""
+
+    @abstractmethod
+    def _set(self, key: str, value: Any) -> None:
+        """Store value under key, evicting as needed."""
+
+    @abstractmethod
+    def _clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def _size(self) -> int:
+        """Number of stored entries."""
+
+    def _extra_stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-process cache backed by an OrderedDict (LRU order) with per-entry expiry.
+    With a weigher (e.g. len for row lists) the cache also evicts until the total
+    weight of its entries is within max_weight; a value heavier than max_weight on
+    its own is not cached.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, max_weight: Optional[int] = None,
+                 weigher: Optional[Callable[[Any], int]] = None):
+        super().__init__(ttl, maxsize)
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value, weight = entry
+        if expires_at < time.time():
+            del self._data[key]
+            self.weight -= weight
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _set(self, key, value):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.weight -= old[2]
+        weight = self.weigher(value) if self.weigher else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            self.evictions += 1
+            return
+        self._data[key] = (time.time() + self.ttl, value, weight)
+        self.weight += weight
+        while len(self._data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+            self.evictions += 1
+
+    def _clear(self):
+        self._data.clear()
+        self.weight = 0
+
+    def _size(self):
+        return len(self._data)
+
+    def _extra_stats(self):
+        if self.weigher is None:
+            return {}
+        return {"weight": self.weight, "max_weight": self.max_weight}
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache in a single SQLite file; values are stored as JSON and survive restarts.
+    Hits only read: their LRU recency is buffered in memory and written in one batch
+    on the next set, or once touch_batch keys are pending.
+    """
+
+    def __init__(self, path: str, ttl: float, maxsize: int, touch_batch: int = 256):
+        super().__init__(ttl, maxsize)
+        self.path = path
+        self.touch_batch = touch_batch
+        self._touched: Dict[str, float] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+
+    def _get(self, key):
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < now:
+            self._touched.pop(key, None)
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._touched[key] = now
+        if len(self._touched) >= self.touch_batch:
+            self._flush_touched()
+            self._conn.commit()
+        return json.loads(value)
+
+    def _flush_touched(self):
+        """Write buffered access times so eviction sees the real LRU order."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _set(self, key, value):
+        now = time.time()
+        self._touched.pop(key, None)
+        self._flush_touched()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl, now),
+        )
+        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        overflow = self._size() - self.maxsize
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    def _clear(self):
+        self._touched.clear()
+        self._conn.execute("DELETE FROM cache")
+        self._conn.commit()
+
+    def _size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def build_cache(prefix: str, ttl: float, maxsize: int, path: str, max_weight: Optional[int] = None,
+                weigher: Optional[Callable[[Any], int]] = None, backend: str = "memory") -> Optional[ResponseCache]:
+    """
+    Build a cache from <PREFIX>_CACHE_BACKEND (memory | sqlite | none),
+    <PREFIX>_CACHE_TTL, <PREFIX>_CACHE_MAXSIZE, <PREFIX>_CACHE_PATH and
+    <PREFIX>_CACHE_MAX_WEIGHT, falling back to the given defaults.
+    Weight limits apply to the memory backend only.
+    """
+    backend = os.getenv(f"{prefix}_CACHE_BACKEND", backend).lower()
+    ttl = float(os.getenv(f"{prefix}_CACHE_TTL", ttl))
+    maxsize = int(os.getenv(f"{prefix}_CACHE_MAXSIZE", maxsize))
+    if max_weight is not None:
+        max_weight = int(os.getenv(f"{prefix}_CACHE_MAX_WEIGHT", max_weight))
+    if backend in ("none", "off", ""):
+        return None
+    if backend == "sqlite":
+        return SQLiteCache(os.getenv(f"{prefix}_CACHE_PATH", path), ttl, maxsize)
+    if backend == "memory":
+        return MemoryCache(ttl, maxsize, max_weight, weigher)
+    raise ValueError(f"Unknown {prefix}_CACHE_BACKEND: {backend}")
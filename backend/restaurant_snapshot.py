@@ -0,0 +1,117 @@
+# restaurant_snapshot.py
+
+import os
+import sys
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Local copy of Snowflake's YELP_RESTAURANTS table for offline/fast reads.
+# When RESTAURANT_SNAPSHOT_PATH points at a snapshot file, restaurant lookups in
+# backend.LLMchat are served from it and no Snowflake session is created.
+load_dotenv()
+RESTAURANT_SNAPSHOT_PATH = os.getenv("RESTAURANT_SNAPSHOT_PATH", "")
+DEFAULT_SNAPSHOT_PATH = "data/restaurants.sqlite"
+
+_SCHEMA = (
+    "CREATE TABLE restaurants ("
+    "city_key TEXT NOT NULL, name TEXT, address TEXT, url TEXT, rating REAL)"
+)
+# Serves "top n by rating for a city" straight from the index
+_INDEX = "CREATE INDEX restaurants_city_rating ON restaurants (city_key, rating DESC)"
+
+
+class RestaurantSnapshot:
+    """Read-only restaurant lookups from a SQLite snapshot."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def top(self, city: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Restaurants for a city, best rated first, in the same shape as the Snowflake path."""
+        sql = "SELECT name, address, url, rating FROM restaurants WHERE city_key = ? ORDER BY rating DESC"
+        params: tuple = (city.lower(),)
+        if limit:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"NAME": n, "ADDRESS": a, "URL": u, "RATING": r} for n, a, u, r in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM restaurants").fetchone()[0]
+
+
+_snapshot: Optional[RestaurantSnapshot] = None
+_snapshot_loaded = False
+_snapshot_lock = threading.Lock()
+
+
+def get_restaurant_snapshot() -> Optional[RestaurantSnapshot]:
+    """Return the shared snapshot, or None if RESTAURANT_SNAPSHOT_PATH is not set."""
+    global _snapshot, _snapshot_loaded
+    with _snapshot_lock:
+        if not _snapshot_loaded:
+            if RESTAURANT_SNAPSHOT_PATH:
+                if not os.path.exists(RESTAURANT_SNAPSHOT_PATH):
+                    raise FileNotFoundError(
+                        f"{RESTAURANT_SNAPSHOT_PATH} not found; run `python -m backend.restaurant_snapshot export`"
+                    )
+                _snapshot = RestaurantSnapshot(RESTAURANT_SNAPSHOT_PATH)
+                print(f"[restaurant_snapshot] Serving restaurants from {RESTAURANT_SNAPSHOT_PATH}")
+            _snapshot_loaded = True
+    return _snapshot
+
+
+def export_snapshot(session, path: str = DEFAULT_SNAPSHOT_PATH, batch_size: int = 5000) -> int:
+    """
+    Copy YELP_RESTAURANTS from a Snowflake session into a SQLite file at path.
+    The file is written alongside and renamed into place, so readers never see
+    a partial snapshot. Returns the number of rows written.
+    """
+    from snowflake.snowpark.functions import lower
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    df = session.table("YELP_RESTAURANTS")
+    rows = df.select(lower(df["CITY"]).alias("CITY_KEY"), "NAME", "ADDRESS", "URL", "RATING").to_local_iterator()
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute(_SCHEMA)
+    written, batch = 0, []
+    for row in rows:
+        batch.append((row["CITY_KEY"], row["NAME"], row["ADDRESS"], row["URL"], row["RATING"]))
+        if len(batch) >= batch_size:
+            conn.executemany("INSERT INTO restaurants VALUES (?, ?, ?, ?, ?)", batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO restaurants VALUES (?, ?, ?, ?, ?)", batch)
+        written += len(batch)
+    conn.execute(_INDEX)
+    conn.commit()
+    conn.close()
+
+    os.replace(tmp_path, path)
+    return written
+
+
+if __name__ == "__main__":
+    # Snapshot Snowflake for offline use: python -m backend.restaurant_snapshot export [path]
+    from backend.LLMchat import snowflake_session
+
+    if not sys.argv[1:] or sys.argv[1] != "export":
+        print("Usage: python -m backend.restaurant_snapshot export [path]")
+        sys.exit(1)
+    path = sys.argv[2] if len(sys.argv) > 2 else (RESTAURANT_SNAPSHOT_PATH or DEFAULT_SNAPSHOT_PATH)
+    with snowflake_session() as session:
+        count = export_snapshot(session, path)
+    print(f"Wrote {count} restaurants to {path}")
@@ -0,0 +1,181 @@
+# snowflake_pool.py
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Tuple, TypeVar
+
+from dotenv import load_dotenv
+
+# Bounded pool of Snowflake sessions shared by the worker threads.
+load_dotenv()
+SNOWFLAKE_POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "4"))
+# Sessions idle longer than this are closed instead of reused
+SNOWFLAKE_POOL_IDLE_TIMEOUT = float(os.getenv("SNOWFLAKE_POOL_IDLE_TIMEOUT", "1800"))
+# Sessions idle longer than this are probed with SELECT 1 before being handed out
+SNOWFLAKE_POOL_PROBE_AFTER = float(os.getenv("SNOWFLAKE_POOL_PROBE_AFTER", "60"))
+# Seconds to wait for a free session before giving up
+SNOWFLAKE_POOL_ACQUIRE_TIMEOUT = float(os.getenv("SNOWFLAKE_POOL_ACQUIRE_TIMEOUT", "30"))
+
+T = TypeVar("T")
+
+
+class SessionPool:
+    """
+    Thread-safe pool of up to `size` sessions created by `factory`.
+    Idle sessions past idle_timeout are recycled, sessions idle past probe_after
+    must pass a liveness probe before reuse, and sessions whose work raised are
+    discarded so the next acquire reconnects. Acquire wait times are recorded
+    and reported by stats().
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = SNOWFLAKE_POOL_SIZE,
+        idle_timeout: float = SNOWFLAKE_POOL_IDLE_TIMEOUT,
+        probe_after: float = SNOWFLAKE_POOL_PROBE_AFTER,
+        acquire_timeout: float = SNOWFLAKE_POOL_ACQUIRE_TIMEOUT,
+    ):
+        self.factory = factory
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.probe_after = probe_after
+        self.acquire_timeout = acquire_timeout
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        # Metrics
+        self.acquired = 0
+        self.created = 0
+        self.recycled = 0
+        self.probe_failures = 0
+        self.discarded = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def acquire(self) -> Any:
+        """Check out a live session, creating one if the pool has room."""
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            session, idle_for, create = None, 0.0, False
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No Snowflake session available after {self.acquire_timeout}s")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    session, released_at = self._idle.pop()
+                    idle_for = time.monotonic() - released_at
+                else:
+                    self._open += 1
+                    create = True
+
+            if create:
+                try:
+                    session = self.factory()
+                except Exception:
+                    self._forget()
+                    raise
+                self._count("created")
+            elif idle_for > self.idle_timeout:
+                self._count("recycled")
+                self._close(session)
+                continue
+            elif idle_for > self.probe_after and not self._alive(session):
+                self._count("probe_failures")
+                self._close(session)
+                continue
+
+            waited = time.perf_counter() - start
+            with self._cond:
+                self.acquired += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            return session
+
+    def release(self, session: Any, broken: bool = False) -> None:
+        """Return a session to the pool, or close it if it is broken."""
+        if broken:
+            self._count("discarded")
+            self._close(session)
+            return
+        with self._cond:
+            self._idle.append((session, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """Borrow a session for the duration of a with-block."""
+        session = self.acquire()
+        try:
+            yield session
+        except BaseException:
+            self.release(session, broken=True)
+            raise
+        self.release(session)
+
+    def run(self, fn: Callable[[Any], T], retries: int = 1) -> T:
+        """
+        Call fn(session), retrying on a fresh session if it fails. Only use for
+        read-only work: a failed attempt is assumed to be safe to repeat.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.session() as session:
+                    return fn(session)
+            except TimeoutError:
+                raise
+            except Exception:
+                if attempt == retries:
+                    raise
+
+    def close(self) -> None:
+        """Close every idle session."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for session, _ in idle:
+            self._close(session)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "acquired": self.acquired,
+                "created": self.created,
+                "recycled": self.recycled,
+                "probe_failures": self.probe_failures,
+                "discarded": self.discarded,
+                "acquire_wait_avg_ms": round(self.wait_total / self.acquired * 1000, 3) if self.acquired else 0.0,
+                "acquire_wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+    def _count(self, metric: str) -> None:
+        with self._cond:
+            setattr(self, metric, getattr(self, metric) + 1)
+
+    @staticmethod
+    def _alive(session: Any) -> bool:
+        try:
+            session.sql("SELECT 1").collect()
+            return True
+        except Exception:
+            return False
+
+    def _close(self, session: Any) -> None:
+        try:
+            session.close()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
@@ -0,0 +1,60 @@
+# sse.py
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+# Server-Sent Events encoding shared by the MCP server (producer) and the API's
+# MCP client (consumer). Events are {"event": name, "data": JSON payload}.
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class SSEDecoder:
+    """Incremental decoder: feed() lines as they arrive, flush() at end of stream."""
+
+    def __init__(self):
+        self.event = "message"
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """Consume one line; returns an event when the line completes one."""
+        if not line:
+            return self.flush()
+        if line.startswith("event:"):
+            self.event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            self.data.append(line[len("data:"):].strip())
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Return the pending event, if any, and reset."""
+        event = {"event": self.event, "data": json.loads("\n".join(self.data))} if self.data else None
+        self.event, self.data = "message", []
+        return event
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Decode Server-Sent Event lines into {"event": name, "data": payload} dicts."""
+    decoder = SSEDecoder()
+    for line in lines:
+        event = decoder.feed(line)
+        if event is not None:
+            yield event
+    event = decoder.flush()
+    if event is not None:
+        yield event
+
+
+async def aparse_sse(lines: AsyncIterable[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Async parse_sse, for httpx.Response.aiter_lines()."""
+    decoder = SSEDecoder()
+    async for line in lines:
+        event = decoder.feed(line)
+        if event is not None:
+            yield event
+    event = decoder.flush()
+    if event is not None:
+        yield event
@@ -10,7 +10,7 @@ from pandas import DataFrame
 
 from backend.flight_search import FlightDataExtractor
 from backend.hotel_search import query_hotels
-from backend.LLMchat import get_restaurants_from_snowflake, search_places
+from backend.LLMchat import search_attractions_and_restaurants
 
 # Load API keys
 load_dotenv()
@@ -92,8 +92,7 @@ def search_trip(
         amenities=[]
     )[:max_results]
 
-    restaurants: DataFrame = get_restaurants_from_snowflake(destination)
-    attractions: List[str] = search_places(destination)
+    attractions, restaurants = search_attractions_and_restaurants(destination)
 
     return {
         "flight_options": flight_options,
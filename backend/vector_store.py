@@ -0,0 +1,185 @@
+# vector_store.py
+
+import os
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.hotel_ingest import CITY_FIELD, iter_index_vectors
+
+# Pluggable vector search for hotel metadata.
+# HOTEL_VECTOR_BACKEND=pinecone (default) queries the hosted index;
+# HOTEL_VECTOR_BACKEND=local serves queries from an on-disk snapshot with NumPy.
+load_dotenv()
+HOTEL_VECTOR_BACKEND = os.getenv("HOTEL_VECTOR_BACKEND", "pinecone").lower()
+HOTEL_VECTOR_SNAPSHOT = os.getenv("HOTEL_VECTOR_SNAPSHOT", "data/hotels_snapshot")
+
+
+class VectorStore(ABC):
+    """
+    Minimal query interface shared by all backends. query() returns a dict
+    shaped like a Pinecone response: {"matches": [{"id", "score", "metadata"}]}.
+    """
+
+    @abstractmethod
+    def query(self, vector: List[float], top_k: int, include_metadata: bool = True,
+              filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Top-k matches for vector among entries whose metadata passes filter."""
+
+
+class PineconeVectorStore(VectorStore):
+    """Pass-through to a Pinecone index."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
+        kwargs = {"vector": vector, "top_k": top_k, "include_metadata": include_metadata}
+        if filter:
+            kwargs["filter"] = filter
+        return self.index.query(**kwargs)
+
+
+def _matches_filter(metadata: Dict[str, Any], flt: Dict[str, Any]) -> bool:
+    """Evaluate the subset of Pinecone's filter language used by query_hotels."""
+    for field, condition in flt.items():
+        if field == "$or":
+            if not any(_matches_filter(metadata, clause) for clause in condition):
+                return False
+            continue
+        if field == "$and":
+            if not all(_matches_filter(metadata, clause) for clause in condition):
+                return False
+            continue
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        value = metadata.get(field)
+        for op, target in condition.items():
+            if op == "$exists":
+                if (value is not None) != target:
+                    return False
+                continue
+            if value is None:
+                return False
+            if op == "$eq" and value != target:
+                return False
+            if op == "$ne" and value == target:
+                return False
+            if op == "$gte" and not value >= target:
+                return False
+            if op == "$gt" and not value > target:
+                return False
+            if op == "$lte" and not value <= target:
+                return False
+            if op == "$lt" and not value < target:
+                return False
+            if op == "$in" and value not in target:
+                return False
+    return True
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Exact (brute-force) cosine search over a snapshot held in memory.
+    <path>.npy holds normalized float32 vectors; <path>.json holds the
+    matching ids and metadata in the same order.
+
+    Rows are indexed by city, so a filtered query only tests and scores the
+    hotels of the requested city instead of walking the whole snapshot.
+    """
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict[str, Any]]):
+        self.ids = ids
+        self.vectors = vectors
+        self.metadata = metadata
+        by_city: Dict[Any, List[int]] = {}
+        for i, m in enumerate(metadata):
+            by_city.setdefault(m.get(CITY_FIELD), []).append(i)
+        self._city_rows = {city: np.asarray(rows, dtype=np.int64) for city, rows in by_city.items()}
+
+    @classmethod
+    def load(cls, path: str = HOTEL_VECTOR_SNAPSHOT) -> "LocalVectorStore":
+        vectors = np.load(f"{path}.npy", mmap_mode="r")
+        with open(f"{path}.json", encoding="utf-8") as f:
+            records = json.load(f)
+        return cls(records["ids"], vectors, records["metadata"])
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        if filter:
+            rows = self._filter_rows(filter)
+            candidates = self.vectors[rows]
+        else:
+            rows = np.arange(len(self.ids))
+            candidates = self.vectors
+        if rows.size == 0:
+            return {"matches": []}
+
+        scores = candidates @ q
+        k = min(top_k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return {
+            "matches": [
+                {
+                    "id": self.ids[rows[i]],
+                    "score": float(scores[i]),
+                    "metadata": self.metadata[rows[i]] if include_metadata else None,
+                }
+                for i in top
+            ]
+        }
+
+    def _filter_rows(self, flt: Dict[str, Any]) -> np.ndarray:
+        """Row numbers passing flt: the city index narrows them, the rest of flt is checked per row."""
+        condition = flt.get(CITY_FIELD)
+        if isinstance(condition, dict) and set(condition) == {"$eq"}:
+            condition = condition["$eq"]
+        if condition is None or isinstance(condition, dict):
+            rows, rest = np.arange(len(self.ids)), flt
+        else:
+            rows = self._city_rows.get(condition, np.empty(0, dtype=np.int64))
+            rest = {field: c for field, c in flt.items() if field != CITY_FIELD}
+        if not rest:
+            return rows
+        return np.fromiter((i for i in rows if _matches_filter(self.metadata[i], rest)), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def export_snapshot(index, path: str = HOTEL_VECTOR_SNAPSHOT) -> int:
+    """Copy every vector and its metadata from a Pinecone index to <path>.npy/.json. Returns the count."""
+    ids, vectors, metadata = [], [], []
+    for vector in iter_index_vectors(index):
+        ids.append(vector.id)
+        vectors.append(vector.values)
+        metadata.append(dict(vector.metadata or {}))
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.save(f"{path}.npy", matrix)
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "metadata": metadata}, f, ensure_ascii=False)
+    return len(ids)
+
+
+if __name__ == "__main__":
+    # Snapshot the hosted index for the local backend: python -m backend.vector_store snapshot
+    from backend.hotel_search import get_pinecone_index
+
+    if sys.argv[1:] != ["snapshot"]:
+        print("Usage: python -m backend.vector_store snapshot")
+        sys.exit(1)
+    count = export_snapshot(get_pinecone_index())
+    print(f"Wrote {count} vectors to {HOTEL_VECTOR_SNAPSHOT}.npy")
@@ -0,0 +1,100 @@
+"""
+Benchmark: amenity filtering CPU time per request in backend.hotel_search.
+
+Compares the original per-hotel fuzzy_match loop (one pair of model.encode
+calls per hotel per non-exact amenity) with filter_by_amenities (one batched
+encode of unseen strings + a single similarity matrix), on synthetic
+candidates shaped like hotels-index metadata.
+
+Usage:
+    python -m benchmarks.bench_amenity_filter --hotels 100 --repeat 5
+"""
+import argparse
+import random
+import time
+
+from sentence_transformers import SentenceTransformer, util
+
+from backend import hotel_search
+from backend.embeddings import EMBEDDING_MODEL, get_embedder
+
+VOCAB = [
+    "Free Wi-Fi", "Free parking", "Pool", "Outdoor pool", "Indoor pool", "Hot tub", "Spa",
+    "Fitness centre", "Restaurant", "Bar", "Room service", "Business centre", "Air conditioning",
+    "Laundry service", "Pet-friendly", "Child-friendly", "Airport shuttle", "Free breakfast",
+    "Kitchen in some rooms", "Accessible", "Beach access", "EV charger", "Smoke-free property",
+]
+
+
+def legacy_filter(model, hotels, amenities, threshold=0.7):
+    """The pre-batching implementation: encode per hotel, per amenity."""
+
+    def fuzzy(user, hotel):
+        if not hotel:
+            return False
+        scores = util.cos_sim(
+            model.encode(user, convert_to_tensor=True),
+            model.encode(hotel, convert_to_tensor=True),
+        )
+        return all(scores[i].max().item() >= threshold for i in range(len(user)))
+
+    kept = []
+    for h in hotels:
+        ok = True
+        for a in amenities:
+            if a.lower() in hotel_search.EXACT_AMENITIES:
+                ok = any(a.lower() == x.lower() for x in h["key_amenities"])
+            else:
+                ok = fuzzy([a], h["key_amenities"])
+            if not ok:
+                break
+        if ok:
+            kept.append(h)
+    return kept
+
+
+def cpu_time(fn, *args):
+    start = time.process_time()
+    result = fn(*args)
+    return time.process_time() - start, result
+
+
+def main(n_hotels, repeat):
+    random.seed(0)
+    hotels = [
+        {"name": f"Hotel {i}", "key_amenities": random.sample(VOCAB, 8)}
+        for i in range(n_hotels)
+    ]
+    amenities = ["wifi", "swimming pool", "Free breakfast"]
+
+    # Load the models outside the measurement
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    get_embedder().encode(["warm up"])
+
+    legacy_times, cold_times, warm_times = [], [], []
+    for _ in range(repeat):
+        t, legacy = cpu_time(legacy_filter, model, hotels, amenities)
+        legacy_times.append(t)
+
+        hotel_search._amenity_vectors.clear()
+        t, batched = cpu_time(hotel_search.filter_by_amenities, hotels, amenities)
+        cold_times.append(t)
+
+        t, _ = cpu_time(hotel_search.filter_by_amenities, hotels, amenities)
+        warm_times.append(t)
+
+    same = [h["name"] for h in legacy] == [h["name"] for h in batched]
+    best = lambda xs: min(xs) * 1000
+    print(f"candidates              : {n_hotels}, amenities: {amenities}")
+    print(f"legacy per-hotel encode : {best(legacy_times):8.1f} ms CPU")
+    print(f"batched (cold table)    : {best(cold_times):8.1f} ms CPU")
+    print(f"batched (warm table)    : {best(warm_times):8.1f} ms CPU")
+    print(f"identical results       : {same} ({len(batched)} kept)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotels", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.hotels, args.repeat)
@@ -0,0 +1,73 @@
+"""
+Benchmark: embedding runtimes for hotel search (PyTorch fp32 vs. ONNX Runtime fp32 vs. int8).
+
+Encodes hotel queries and amenity strings with each backend and reports batch
+throughput, single-text latency percentiles (the get_embedding path) and cosine
+agreement of every vector with the PyTorch fp32 baseline. The ONNX backends
+need `python -m backend.embeddings export` first.
+
+Usage:
+    python -m benchmarks.bench_embeddings --backends torch onnx onnx-int8 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.embeddings import create_embedder
+
+CITIES = ["boston", "chicago", "miami", "seattle", "austin", "denver", "new york", "los angeles"]
+QUERIES = [
+    "hotels in {city}",
+    "hotels in {city} with rating >= 4.0",
+    "hotels in {city} with nightly price under 200",
+    "hotels in {city} with amenities: Pool, Free Wi-Fi, Free breakfast",
+]
+AMENITIES = [
+    "Free Wi-Fi", "wifi", "Free parking", "Pool", "swimming pool", "Outdoor pool", "Hot tub", "Spa",
+    "Fitness centre", "gym", "Restaurant", "Bar", "Room service", "Air conditioning",
+    "Laundry service", "Pet-friendly", "Airport shuttle", "Free breakfast", "Beach access", "EV charger",
+]
+
+
+def main(backends, repeat, batch_size):
+    texts = [q.format(city=c) for c in CITIES for q in QUERIES] + AMENITIES
+    baseline = None
+
+    for name in backends:
+        start = time.perf_counter()
+        embedder = create_embedder(name)
+        embedder.encode(["warm up"])
+        load_ms = (time.perf_counter() - start) * 1000
+
+        batch_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            vectors = embedder.encode(texts, batch_size=batch_size)
+            batch_times.append(time.perf_counter() - start)
+
+        latencies = []
+        for text in texts:
+            start = time.perf_counter()
+            embedder.encode([text])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        print(f"{name}")
+        print(f"  load + first encode : {load_ms:8.1f} ms")
+        print(f"  throughput          : {len(texts) / min(batch_times):8.1f} texts/s (batch {batch_size})")
+        print(f"  latency p50/p95     : {np.percentile(latencies, 50):6.2f} / {np.percentile(latencies, 95):6.2f} ms")
+        if name == "torch":
+            baseline = vectors
+        elif baseline is not None:
+            agreement = (vectors * baseline).sum(axis=1)
+            print(f"  cosine vs torch     : mean {agreement.mean():.5f}, min {agreement.min():.5f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"],
+                        help="torch first so the others are compared against it")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    main(args.backends, args.repeat, args.batch_size)
@@ -0,0 +1,53 @@
+"""
+Benchmark: import cost of backend modules, measured with `python -X importtime`.
+
+Runs each import in a fresh interpreter and reports the cumulative time of the
+target module plus its heaviest transitive imports. With lazy initialization
+in backend.hotel_search, sentence_transformers/torch and pinecone no longer
+appear under the hotel_search import.
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time backend.hotel_search api.services.hotel_service
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def import_times(module):
+    """Return [(cumulative_us, module_name)] from -X importtime for one fresh import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main(modules, top):
+    for module in modules:
+        rows = import_times(module)
+        total = next(us for us, name in rows if name.strip() == module)
+        print(f"{module}: {total / 1000:.1f} ms cumulative")
+        heaviest = sorted(rows, reverse=True)
+        for us, name in heaviest[1:top + 1]:
+            print(f"    {us / 1000:9.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["backend.hotel_search", "api.services.hotel_service"])
+    parser.add_argument("--top", type=int, default=8, help="heaviest transitive imports to list")
+    args = parser.parse_args()
+    main(args.modules, args.top)
@@ -0,0 +1,164 @@
+"""
+Benchmark: itinerary parsing time in the MCP server.
+
+Compares the original regex extractors (extract_daily_plans, extract_highlights
+and estimate_costs each rescanning the whole text, six lazy DOTALL searches per
+day) with backend.itinerary_parser.parse_itinerary (one pass over the lines),
+on synthetic GPT-style itineraries of increasing length. Rows marked "u" are
+unstructured prose with no highlights section or punctuation, where the legacy
+whole-text fallback patterns backtrack quadratically.
+
+Usage:
+    python -m benchmarks.bench_itinerary_parser --days 3 7 14 30 --repeat 20
+"""
+import argparse
+import random
+import re
+import time
+
+from backend.itinerary_parser import costs_for, parse_itinerary
+
+PLACES = [
+    "the Freedom Trail", "Faneuil Hall", "the Museum of Fine Arts", "Fenway Park", "the Boston Common",
+    "the Isabella Stewart Gardner Museum", "Beacon Hill", "the North End", "the Seaport District",
+    "Harvard Square", "the New England Aquarium", "the Public Garden",
+]
+RESTAURANTS = ["Neptune Oyster", "Giacomo's", "Mike's Pastry", "Row 34", "Toro", "Union Oyster House"]
+
+
+def legacy_extract_daily_plans(itinerary):
+    daily_plans = []
+    day_pattern = r"Day\s+(\d+).*?:(.*?)(?=Day\s+\d+|$)"
+    days = re.findall(day_pattern, itinerary, re.DOTALL | re.IGNORECASE)
+    if not days:
+        day_pattern = r"Day\s+(\d+)(.*?)(?=Day\s+\d+|$)"
+        days = re.findall(day_pattern, itinerary, re.DOTALL | re.IGNORECASE)
+    for day_num, content in days:
+        morning = re.search(r"Morning:?(.*?)(?=Afternoon|Lunch|Midday|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
+        afternoon = re.search(r"(?:Afternoon|Midday):?(.*?)(?=Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
+        evening = re.search(r"(?:Evening|Night):?(.*?)$", content, re.DOTALL | re.IGNORECASE)
+        breakfast = re.search(r"Breakfast:?(.*?)(?=Lunch|Afternoon|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
+        lunch = re.search(r"Lunch:?(.*?)(?=Afternoon|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
+        dinner = re.search(r"Dinner:?(.*?)$", content, re.DOTALL | re.IGNORECASE)
+        daily_plans.append({
+            "day": int(day_num),
+            "morning": morning.group(1).strip() if morning else "",
+            "afternoon": afternoon.group(1).strip() if afternoon else "",
+            "evening": evening.group(1).strip() if evening else "",
+            "breakfast": breakfast.group(1).strip() if breakfast else "",
+            "lunch": lunch.group(1).strip() if lunch else "",
+            "dinner": dinner.group(1).strip() if dinner else "",
+        })
+    return daily_plans
+
+
+def legacy_extract_highlights(itinerary):
+    highlights = []
+    highlights_section = re.search(r"Highlights:?(.*?)(?=Day\s+\d+|$)", itinerary, re.DOTALL | re.IGNORECASE)
+    if highlights_section:
+        bullets = re.findall(r"[•\-\*]\s+(.*?)(?=[•\-\*]|$)", highlights_section.group(1), re.DOTALL)
+        if bullets:
+            highlights = [bullet.strip() for bullet in bullets]
+        else:
+            lines = highlights_section.group(1).strip().split("\n")
+            highlights = [line.strip() for line in lines if line.strip()]
+    if not highlights:
+        highlight_phrases = re.findall(r"(?:must-see|highlight|don't miss|famous|popular|renowned).*?([\w\s']+)(?:\.|\,)", itinerary, re.IGNORECASE)
+        if highlight_phrases:
+            highlights = [h.strip() for h in highlight_phrases[:5]]
+    if not highlights:
+        attractions = re.findall(r"(?:visit|explore|see).*?([\w\s']+)(?:\.|\,)", itinerary, re.IGNORECASE)
+        highlights = [a.strip() for a in attractions[:5] if len(a.strip()) > 3]
+    return highlights[:5]
+
+
+def legacy_estimate_costs(itinerary, budget_level):
+    base_costs = {
+        "budget": {"accommodation": 75, "food": 40, "activities": 30, "transportation": 20},
+        "medium": {"accommodation": 150, "food": 80, "activities": 60, "transportation": 40},
+        "luxury": {"accommodation": 300, "food": 150, "activities": 120, "transportation": 80},
+    }
+    costs = base_costs.get(budget_level.lower(), base_costs["medium"])
+    if re.search(r"luxury|five-star|5-star|high-end|gourmet|exclusive", itinerary, re.IGNORECASE):
+        costs["accommodation"] *= 1.2
+        costs["food"] *= 1.2
+    if re.search(r"museum|theater|show|concert|tour|guide", itinerary, re.IGNORECASE):
+        costs["activities"] *= 1.15
+    if re.search(r"taxi|uber|lyft|car service|private", itinerary, re.IGNORECASE):
+        costs["transportation"] *= 1.3
+    return costs
+
+
+def legacy_parse(itinerary):
+    return (
+        legacy_extract_daily_plans(itinerary),
+        legacy_extract_highlights(itinerary),
+        legacy_estimate_costs(itinerary, "medium"),
+    )
+
+
+def single_pass_parse(itinerary):
+    parsed = parse_itinerary(itinerary)
+    return parsed["daily_plans"], parsed["highlights"], costs_for("medium", parsed["cost_signals"])
+
+
+def make_itinerary(days, rng):
+    """A long itinerary in the markdown shape GPT-4 returns for the MCP prompt."""
+    lines = [
+        "# Your Boston Adventure",
+        "",
+        "Boston blends revolutionary history with a lively food scene. Here is your plan.",
+        "",
+        "**Key Highlights:**",
+    ]
+    lines += [f"- Explore {p} at your own pace" for p in rng.sample(PLACES, 4)]
+    for day in range(1, days + 1):
+        lines += ["", f"## Day {day}: {rng.choice(PLACES).title()}", ""]
+        for label in ("Morning", "Lunch", "Afternoon", "Dinner", "Evening"):
+            place = rng.choice(RESTAURANTS if label in ("Lunch", "Dinner") else PLACES)
+            lines.append(f"**{label}:** Head to {place}.")
+            for _ in range(rng.randint(2, 5)):
+                lines.append(
+                    f"- Spend time around {rng.choice(PLACES)}, a popular stop with a guided tour option; "
+                    f"take a taxi if the weather turns, then continue to {rng.choice(PLACES)}."
+                )
+    lines += ["", "## Estimated Daily Costs", "- Accommodation: $150", "- Food: $80", "- Activities: $60"]
+    return "\n".join(lines)
+
+
+def make_unstructured(days, rng):
+    """Prose without a highlights section or punctuation: the legacy fallbacks' worst case."""
+    return "\n".join(
+        f"On day {day} we see {rng.choice(PLACES)} and then wander over to {rng.choice(PLACES)} "
+        f"before we visit {rng.choice(RESTAURANTS)} for a late meal"
+        for day in range(1, days * 8 + 1)
+    )
+
+
+def wall_time(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(text)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(day_counts, repeat):
+    rng = random.Random(0)
+    print(f"{'days':>5} {'chars':>8} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}  days found")
+    corpus = [(f"{days:>5}", make_itinerary(days, rng)) for days in day_counts]
+    corpus += [(f"{days:>4}u", make_unstructured(days, rng)) for days in day_counts]
+    for label, text in corpus:
+        legacy_t, legacy = wall_time(legacy_parse, text, repeat)
+        new_t, new = wall_time(single_pass_parse, text, repeat)
+        print(
+            f"{label} {len(text):>8} {legacy_t * 1000:>10.2f} {new_t * 1000:>15.2f} "
+            f"{legacy_t / new_t:>7.1f}x  {len(legacy[0])} / {len(new[0])}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 7, 14, 30])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.days, args.repeat)
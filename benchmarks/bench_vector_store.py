@@ -0,0 +1,75 @@
+"""
+Benchmark: local NumPy vector store vs. Pinecone for hotel search.
+
+Embeds a set of representative hotel queries, runs each against both backends
+(with and without the typed metadata filter) and reports recall@k of the local
+results against Pinecone's, plus per-query latency percentiles. Requires a
+snapshot built with `python -m backend.vector_store snapshot`.
+
+Usage:
+    python -m benchmarks.bench_vector_store --top-k 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend import hotel_search
+from backend.embeddings import get_embedder
+from backend.hotel_ingest import build_filter
+from backend.vector_store import HOTEL_VECTOR_SNAPSHOT, LocalVectorStore, PineconeVectorStore
+
+CITIES = ["boston", "chicago", "miami", "seattle", "austin", "denver", "new york", "los_angeles"]
+TEMPLATES = [
+    "hotels in {city}",
+    "hotels in {city} with rating >= 4.0",
+    "hotels in {city} with nightly price under 200",
+    "hotels in {city} with amenities: Pool, Free Wi-Fi",
+]
+
+
+def run(store, queries, top_k, use_filter):
+    latencies, ids = [], []
+    for city, vector in queries:
+        flt = build_filter(city) if use_filter else None
+        start = time.perf_counter()
+        response = store.query(vector=vector, top_k=top_k, include_metadata=True, filter=flt)
+        latencies.append(time.perf_counter() - start)
+        ids.append([m["id"] for m in response["matches"]])
+    return np.array(latencies) * 1000, ids
+
+
+def recall(reference, candidate, k):
+    scores = [
+        len(set(ref[:k]) & set(cand[:k])) / min(k, len(ref))
+        for ref, cand in zip(reference, candidate) if ref
+    ]
+    return float(np.mean(scores)) if scores else float("nan")
+
+
+def main(top_k):
+    texts = [(city, t.format(city=city)) for city in CITIES for t in TEMPLATES]
+    vectors = get_embedder().encode([t for _, t in texts]).tolist()
+    queries = [(city, v) for (city, _), v in zip(texts, vectors)]
+
+    pinecone = PineconeVectorStore(hotel_search.get_pinecone_index())
+    start = time.perf_counter()
+    local = LocalVectorStore.load(HOTEL_VECTOR_SNAPSHOT)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"local snapshot: {len(local)} vectors, loaded in {load_ms:.1f} ms")
+
+    for use_filter in (False, True):
+        ref_lat, ref_ids = run(pinecone, queries, top_k, use_filter)
+        loc_lat, loc_ids = run(local, queries, top_k, use_filter)
+        label = "filtered" if use_filter else "unfiltered"
+        print(f"\n{label} ({len(queries)} queries, k={top_k})")
+        print(f"  pinecone latency p50/p95 : {np.percentile(ref_lat, 50):7.1f} / {np.percentile(ref_lat, 95):7.1f} ms")
+        print(f"  local    latency p50/p95 : {np.percentile(loc_lat, 50):7.1f} / {np.percentile(loc_lat, 95):7.1f} ms")
+        print(f"  recall@{top_k} (local vs pinecone): {recall(ref_ids, loc_ids, top_k):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+    main(args.top_k)
@@ -0,0 +1,10 @@
+"""Summary statistics shared by the load tests."""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (pct in 0-100); NaN when empty."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
@@ -0,0 +1,95 @@
+"""
+Load test for the Travel Explorer API event loop.
+
+Fires N concurrent slow requests (flight/hotel/trip searches) at a running API
+and, while they are in flight, keeps polling /api/health. If handlers block the
+event loop, health latency climbs to the duration of the slow calls and the
+slow calls finish one after another; with the async service layer the health
+probe stays fast and total wall time is close to the slowest single request.
+
+By default every request is identical, so single-flight and the response caches
+coalesce them into one upstream call. Pass --distinct to give each request its
+own route and dates (or city and price cap) and measure uncoalesced load.
+
+Usage:
+    python -m benchmarks.load_test_api --url http://localhost:8000 --concurrency 8 [--distinct]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.load_stats import percentile
+
+ROUTES = [("BOS", "LAX"), ("JFK", "SFO"), ("ORD", "MIA"), ("SEA", "DEN"), ("ATL", "LAS"), ("DFW", "BOS")]
+CITIES = ["boston", "new york", "chicago", "miami", "seattle", "san francisco"]
+
+
+async def _timed_get(client, path, params=None):
+    start = time.perf_counter()
+    try:
+        resp = await client.get(path, params=params)
+        status = resp.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return time.perf_counter() - start, status
+
+
+async def _poll_health(client, stop, latencies):
+    while not stop.is_set():
+        elapsed, _ = await _timed_get(client, "/api/health")
+        latencies.append(elapsed)
+        await asyncio.sleep(0.1)
+
+
+def _request(endpoint, i):
+    """Path and params of the i-th request; i=0 for every request unless --distinct."""
+    if endpoint == "hotels":
+        # Rotate cities, then lower the price cap so no two requests share a cache key
+        city = CITIES[i % len(CITIES)]
+        return "/api/hotels/search", {"city": city, "max_results": 20, "max_price": 1000 - 10 * (i // len(CITIES))}
+    origin, destination = ROUTES[i % len(ROUTES)]
+    dep = (date.today() + timedelta(days=30 + i)).strftime("%Y-%m-%d")
+    ret = (date.today() + timedelta(days=35 + i)).strftime("%Y-%m-%d")
+    return "/api/flights/search", {"origin": origin, "destination": destination, "departure_date": dep, "return_date": ret}
+
+
+async def main(url, concurrency, endpoint, distinct=False):
+    requests = [_request(endpoint, i if distinct else 0) for i in range(concurrency)]
+
+    limits = httpx.Limits(max_connections=concurrency + 4)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        stop = asyncio.Event()
+        health = []
+        poller = asyncio.create_task(_poll_health(client, stop, health))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[_timed_get(client, path, params) for path, params in requests])
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await poller
+
+    durations = [d for d, _ in results]
+    statuses = sorted({str(s) for _, s in results})
+    mode = "distinct" if distinct else "identical"
+    print(f"endpoint            : {requests[0][0]} x{concurrency} ({mode} requests)")
+    print(f"statuses            : {', '.join(statuses)}")
+    print(f"wall time           : {wall:.2f}s")
+    print(f"sum of latencies    : {sum(durations):.2f}s")
+    print(f"request p50 / max   : {statistics.median(durations):.2f}s / {max(durations):.2f}s")
+    print(f"health p50 / p99    : {percentile(health, 50) * 1000:.1f}ms / {percentile(health, 99) * 1000:.1f}ms")
+    print(f"overlap factor      : {sum(durations) / wall:.1f}x (1.0x means requests queued)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoint", choices=["flights", "hotels"], default="flights")
+    parser.add_argument("--distinct", action="store_true", help="vary params per request so caches cannot coalesce them")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.concurrency, args.endpoint, args.distinct))
@@ -0,0 +1,105 @@
+"""
+Load test for the MCP server event loop.
+
+Fires N concurrent LLM requests (itinerary generations or recommendations) at a
+running MCP server and, while they are in flight, keeps polling /health. With a
+blocking OpenAI client each generation stalls the event loop, so /health takes
+as long as the generations and the docker-compose health check (5s timeout)
+fails; with the async client health latency stays in the milliseconds. The
+llm counters reported by /health show the MCP_MAX_CONCURRENT_LLM cap at work.
+Requests set use_cache=False so the LLM response cache cannot answer them and
+every run exercises the concurrency cap.
+
+Usage:
+    python -m benchmarks.load_test_mcp --url http://localhost:8080 --concurrency 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.load_stats import percentile
+
+
+def _payload(endpoint):
+    if endpoint == "recommendations":
+        return "/recommendations", {
+            "city": "Boston", "interests": ["food", "history"], "budget": "medium", "duration": 3, "use_cache": False,
+        }
+    dep = (date.today() + timedelta(days=30)).strftime("%Y-%m-%d")
+    ret = (date.today() + timedelta(days=33)).strftime("%Y-%m-%d")
+    return "/generate/itinerary", {
+        "city": "Boston",
+        "attractions": ["Freedom Trail", "Museum of Fine Arts", "Fenway Park"],
+        "restaurants": [{"NAME": "Neptune Oyster", "RATING": 4.5, "ADDRESS": "63 Salem St"}],
+        "departure_date": dep,
+        "return_date": ret,
+        "flight_info": "Not specified",
+        "hotel_info": "Not specified",
+        "interests": ["food", "history"],
+        "use_cache": False,
+    }
+
+
+async def _timed_post(client, path, body):
+    start = time.perf_counter()
+    try:
+        resp = await client.post(path, json=body)
+        status = resp.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return time.perf_counter() - start, status
+
+
+async def _poll_health(client, stop, latencies, peak):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            resp = await client.get("/health")
+            llm = resp.json().get("llm", {})
+            peak["in_flight"] = max(peak["in_flight"], llm.get("in_flight", 0))
+            peak["waiting"] = max(peak["waiting"], llm.get("waiting", 0))
+        except (httpx.HTTPError, ValueError):
+            pass
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+
+
+async def main(url, concurrency, endpoint):
+    path, body = _payload(endpoint)
+
+    limits = httpx.Limits(max_connections=concurrency + 4)
+    async with httpx.AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        stop = asyncio.Event()
+        health = []
+        peak = {"in_flight": 0, "waiting": 0}
+        poller = asyncio.create_task(_poll_health(client, stop, health, peak))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[_timed_post(client, path, body) for _ in range(concurrency)])
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await poller
+
+    durations = [d for d, _ in results]
+    statuses = sorted({str(s) for _, s in results})
+    print(f"endpoint            : {path} x{concurrency}")
+    print(f"statuses            : {', '.join(statuses)}")
+    print(f"wall time           : {wall:.2f}s")
+    print(f"request p50 / max   : {statistics.median(durations):.2f}s / {max(durations):.2f}s")
+    print(f"health p50 / p99    : {percentile(health, 50) * 1000:.1f}ms / {percentile(health, 99) * 1000:.1f}ms")
+    print(f"health max          : {max(health) * 1000:.1f}ms over {len(health)} probes")
+    print(f"llm peak in flight  : {peak['in_flight']} (waiting: {peak['waiting']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--endpoint", choices=["itinerary", "recommendations"], default="itinerary")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.concurrency, args.endpoint))
@@ -4,16 +4,25 @@ This server provides enhanced trip planning capabilities using LLM integration.
 """
 import os
 import json
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar
 from datetime import datetime, timedelta
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import openai
+from openai import AsyncOpenAI
 import re
+import numpy as np
+
+from backend.itinerary_parser import costs_for, parse_itinerary
+from backend.sse import format_sse
+from backend.response_cache import ResponseCache, build_cache, make_cache_key
 
 # Configure logging
 logging.basicConfig(
@@ -29,7 +38,16 @@ if not OPENAI_API_KEY:
     logger.error("OPENAI_API_KEY not found in environment variables.")
     raise ValueError("OPENAI_API_KEY is required.")
 
-openai.api_key = OPENAI_API_KEY
+# Async client so a long generation never blocks the event loop (and /health with it)
+llm_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# Cap on LLM calls in flight at once; further requests wait for a free slot
+MCP_MAX_CONCURRENT_LLM = int(os.getenv("MCP_MAX_CONCURRENT_LLM", "8"))
+llm_slots = asyncio.Semaphore(MCP_MAX_CONCURRENT_LLM)
+llm_counts = {"in_flight": 0, "waiting": 0}
+# Reuse an earlier response whose request embeds at least this close to the new one;
+# 0 limits the response cache to exact (canonicalized) matches
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0"))
+LLM_CACHE_EMBEDDING_MODEL = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "text-embedding-ada-002")
 
 # --- Models ---
 class Traveler(BaseModel):
@@ -53,6 +71,8 @@ class ItineraryRequest(BaseModel):
     interests: List[str] = Field([], description="List of user interests")
     trip_style: str = Field("balanced", description="Style of trip (relaxed, balanced, intensive)")
     budget_level: str = Field("medium", description="Budget level (budget, medium, luxury)")
+    use_cache: bool = Field(True, description="Set to false to skip the response cache and regenerate")
+    structured: bool = Field(False, description="Have the LLM return JSON validated against the response schema instead of prose")
 
 class RecommendationRequest(BaseModel):
     city: str = Field(..., description="Destination city")
@@ -60,6 +80,41 @@ class RecommendationRequest(BaseModel):
     budget: str = Field("medium", description="Budget level (budget, medium, luxury)")
     duration: int = Field(3, description="Trip duration in days", ge=1, le=30)
     travelers: Optional[Dict[str, Any]] = Field(None, description="Information about travelers")
+    use_cache: bool = Field(True, description="Set to false to skip the response cache and regenerate")
+    structured: bool = Field(False, description="Have the LLM return JSON validated against the response schema instead of prose")
+
+# Function-calling schemas for structured output; they mirror ItineraryResponse and
+# RecommendationResponse in api/mcp/models.py with the loose dicts spelled out
+class PlannedDay(BaseModel):
+    day: int = Field(..., description="Day number, starting at 1")
+    morning: str = Field("", description="Morning activities")
+    afternoon: str = Field("", description="Afternoon activities")
+    evening: str = Field("", description="Evening activities or entertainment")
+    breakfast: str = Field("", description="Breakfast spot")
+    lunch: str = Field("", description="Lunch spot")
+    dinner: str = Field("", description="Dinner spot")
+
+class DailyCosts(BaseModel):
+    accommodation: float = Field(..., description="Accommodation per day in USD")
+    food: float = Field(..., description="Food per day in USD")
+    activities: float = Field(..., description="Activities per day in USD")
+    transportation: float = Field(..., description="Local transportation per day in USD")
+
+class StructuredItinerary(BaseModel):
+    introduction: str = Field(..., description="Brief introduction to the trip")
+    highlights: List[str] = Field(..., description="3-5 key highlights of the trip")
+    daily_plans: List[PlannedDay] = Field(..., description="One entry per day of the trip")
+    estimated_costs: DailyCosts
+
+class RecommendedItem(BaseModel):
+    name: str
+    description: str = Field("", description="1-2 sentences, including why it suits the traveler")
+
+class StructuredRecommendations(BaseModel):
+    recommended_attractions: List[RecommendedItem] = Field(..., description="Top 5 attractions to visit")
+    recommended_restaurants: List[RecommendedItem] = Field(..., description="Top 5 restaurants to try")
+    recommended_activities: List[RecommendedItem] = Field(..., description="Top 5 activities or experiences")
+    recommended_hotels: List[RecommendedItem] = Field(..., description="Top 3 accommodation options")
 
 # --- FastAPI App ---
 app = FastAPI(
@@ -98,148 +153,35 @@ def calculate_trip_length(departure_date: str, return_date: Optional[str] = None
     except:
         return default_nights
 
-def extract_daily_plans(itinerary: str) -> List[Dict[str, Any]]:
-    """Extract structured daily plans from the generated itinerary."""
-    daily_plans = []
-    
-    # Try to find day headers and their content
-    day_pattern = r"Day\s+(\d+).*?:(.*?)(?=Day\s+\d+|$)"
-    days = re.findall(day_pattern, itinerary, re.DOTALL | re.IGNORECASE)
-    
-    if not days:
-        # Alternative pattern for when days are formatted differently
-        day_pattern = r"Day\s+(\d+)(.*?)(?=Day\s+\d+|$)"
-        days = re.findall(day_pattern, itinerary, re.DOTALL | re.IGNORECASE)
-    
-    for day_num, content in days:
-        # Try to extract morning, afternoon, evening sections
-        morning = re.search(r"Morning:?(.*?)(?=Afternoon|Lunch|Midday|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
-        afternoon = re.search(r"(?:Afternoon|Midday):?(.*?)(?=Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
-        evening = re.search(r"(?:Evening|Night):?(.*?)$", content, re.DOTALL | re.IGNORECASE)
-        
-        # Try to extract meal information
-        breakfast = re.search(r"Breakfast:?(.*?)(?=Lunch|Afternoon|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
-        lunch = re.search(r"Lunch:?(.*?)(?=Afternoon|Evening|Dinner|$)", content, re.DOTALL | re.IGNORECASE)
-        dinner = re.search(r"Dinner:?(.*?)$", content, re.DOTALL | re.IGNORECASE)
-        
-        daily_plans.append({
-            "day": int(day_num),
-            "morning": morning.group(1).strip() if morning else "",
-            "afternoon": afternoon.group(1).strip() if afternoon else "",
-            "evening": evening.group(1).strip() if evening else "",
-            "breakfast": breakfast.group(1).strip() if breakfast else "",
-            "lunch": lunch.group(1).strip() if lunch else "",
-            "dinner": dinner.group(1).strip() if dinner else ""
-        })
-    
-    return daily_plans
-
-def extract_highlights(itinerary: str) -> List[str]:
-    """Extract key highlights from the generated itinerary."""
-    highlights = []
+def build_itinerary_prompt(request: ItineraryRequest) -> str:
+    """Build the itinerary generation prompt shared by the blocking and streaming endpoints."""
+    # Format dates for display
+    departure_display = format_date_display(request.departure_date)
+    return_display = format_date_display(request.return_date) if request.return_date else "N/A"
     
-    # Look for a highlights section
-    highlights_section = re.search(r"Highlights:?(.*?)(?=Day\s+\d+|$)", itinerary, re.DOTALL | re.IGNORECASE)
-    if highlights_section:
-        # Extract bullet points
-        bullets = re.findall(r"[•\-\*]\s+(.*?)(?=[•\-\*]|$)", highlights_section.group(1), re.DOTALL)
-        if bullets:
-            highlights = [bullet.strip() for bullet in bullets]
-        else:
-            # If no bullet points, split by newlines
-            lines = highlights_section.group(1).strip().split("\n")
-            highlights = [line.strip() for line in lines if line.strip()]
+    # Calculate trip length
+    trip_length = calculate_trip_length(
+        request.departure_date, 
+        request.return_date,
+        default_nights=3
+    )
     
-    # If no dedicated highlights section, try to extract key phrases
-    if not highlights:
-        # Look for phrases like "must-see", "highlight", "don't miss"
-        highlight_phrases = re.findall(r"(?:must-see|highlight|don't miss|famous|popular|renowned).*?([\w\s']+)(?:\.|\,)", itinerary, re.IGNORECASE)
-        if highlight_phrases:
-            highlights = [h.strip() for h in highlight_phrases[:5]]  # Limit to top 5
+    # Format restaurant data
+    restaurant_list = []
+    for r in request.restaurants:
+        name = r.get("name", r.get("NAME", ""))
+        if not name:
+            continue
+            
+        rating = r.get("rating", r.get("RATING", "N/A"))
+        address = r.get("address", r.get("ADDRESS", ""))
+        restaurant_list.append(f"{name} (Rating: {rating}) - {address}")
     
-    # If still no highlights, create dummy ones based on attractions
-    if not highlights:
-        attractions_pattern = r"(?:visit|explore|see).*?([\w\s']+)(?:\.|\,)"
-        attractions = re.findall(attractions_pattern, itinerary, re.IGNORECASE)
-        highlights = [a.strip() for a in attractions[:5] if len(a.strip()) > 3]
+    # Format attractions
+    attraction_list = request.attractions
     
-    return highlights[:5]  # Limit to 5 main highlights
-
-def estimate_costs(itinerary: str, budget_level: str) -> Dict[str, float]:
-    """Estimate daily costs based on budget level and itinerary content."""
-    # Base costs by budget level
-    base_costs = {
-        "budget": {"accommodation": 75, "food": 40, "activities": 30, "transportation": 20},
-        "medium": {"accommodation": 150, "food": 80, "activities": 60, "transportation": 40},
-        "luxury": {"accommodation": 300, "food": 150, "activities": 120, "transportation": 80}
-    }
-    
-    costs = base_costs.get(budget_level.lower(), base_costs["medium"])
-    
-    # Adjust based on certain keywords in itinerary
-    if re.search(r"luxury|five-star|5-star|high-end|gourmet|exclusive", itinerary, re.IGNORECASE):
-        costs["accommodation"] *= 1.2
-        costs["food"] *= 1.2
-    
-    if re.search(r"museum|theater|show|concert|tour|guide", itinerary, re.IGNORECASE):
-        costs["activities"] *= 1.15
-    
-    if re.search(r"taxi|uber|lyft|car service|private", itinerary, re.IGNORECASE):
-        costs["transportation"] *= 1.3
-    
-    return costs
-
-# --- API Endpoints ---
-@app.get("/")
-async def root():
-    """Root endpoint returning server information."""
-    return {
-        "name": "MCP Server for Travel Explorer",
-        "version": "1.0.0",
-        "status": "running"
-    }
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
-
-@app.post("/generate/itinerary")
-async def generate_itinerary(request: ItineraryRequest):
-    """
-    Generate a personalized travel itinerary using LLM.
-    
-    This endpoint uses OpenAI's GPT model to create detailed, day-by-day travel itineraries
-    based on the provided destination, attractions, restaurants, and other parameters.
-    """
-    try:
-        # Format dates for display
-        departure_display = format_date_display(request.departure_date)
-        return_display = format_date_display(request.return_date) if request.return_date else "N/A"
-        
-        # Calculate trip length
-        trip_length = calculate_trip_length(
-            request.departure_date, 
-            request.return_date,
-            default_nights=3
-        )
-        
-        # Format restaurant data
-        restaurant_list = []
-        for r in request.restaurants:
-            name = r.get("name", r.get("NAME", ""))
-            if not name:
-                continue
-                
-            rating = r.get("rating", r.get("RATING", "N/A"))
-            address = r.get("address", r.get("ADDRESS", ""))
-            restaurant_list.append(f"{name} (Rating: {rating}) - {address}")
-        
-        # Format attractions
-        attraction_list = request.attractions
-        
-        # Build the prompt for the LLM
-        prompt = f"""
+    # Build the prompt for the LLM
+    prompt = f"""
 You are an expert travel planner creating a detailed, personalized travel itinerary. Create a comprehensive day-by-day itinerary for a {trip_length}-day trip to {request.city}.
 
 Trip Details:
@@ -272,51 +214,120 @@ Consider the trip style ({request.trip_style}) when planning the pace - balance
 
 Format the itinerary in a clean, well-organized structure with clear headings for each day and time period.
 """
+    return prompt
 
-        # Call OpenAI API to generate the itinerary
-        response = openai.chat.completions.create(
-            model="gpt-4",  # Adjust based on your requirements
-            messages=[
-                {"role": "system", "content": "You are an expert travel planner and itinerary creator."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=3000
-        )
-        
-        # Extract the generated itinerary
-        itinerary = response.choices[0].message.content
-        
-        # Extract daily plans, highlights, and estimated costs
-        daily_plans = extract_daily_plans(itinerary)
-        highlights = extract_highlights(itinerary)
-        costs = estimate_costs(itinerary, request.budget_level)
-        
-        return {
-            "itinerary": itinerary,
-            "highlights": highlights,
-            "daily_plans": daily_plans,
-            "estimated_costs": costs
-        }
+ITINERARY_SYSTEM_PROMPT = "You are an expert travel planner and itinerary creator."
+ITINERARY_COMPLETION_ARGS = {"model": "gpt-4", "temperature": 0.7, "max_tokens": 3000}
+
+def itinerary_messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": ITINERARY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def build_itinerary_result(itinerary: str, budget_level: str) -> Dict[str, Any]:
+    """Extract daily plans, highlights, and estimated costs from a generated itinerary."""
+    parsed = parse_itinerary(itinerary)
+    return {
+        "itinerary": itinerary,
+        "highlights": parsed["highlights"],
+        "daily_plans": parsed["daily_plans"],
+        "estimated_costs": costs_for(budget_level, parsed["cost_signals"])
+    }
+
+@asynccontextmanager
+async def llm_slot():
+    """Hold one of the MCP_MAX_CONCURRENT_LLM slots for the duration of a with-block."""
+    llm_counts["waiting"] += 1
+    try:
+        await llm_slots.acquire()
+    finally:
+        llm_counts["waiting"] -= 1
+    llm_counts["in_flight"] += 1
+    try:
+        yield
+    finally:
+        llm_counts["in_flight"] -= 1
+        llm_slots.release()
+
+async def complete(messages: List[Dict[str, str]], **kwargs) -> str:
+    """Run one chat completion within the concurrency cap and return its text."""
+    async with llm_slot():
+        response = await llm_client.chat.completions.create(messages=messages, **kwargs)
+    return response.choices[0].message.content
+
+StructuredModel = TypeVar("StructuredModel", bound=BaseModel)
+
+def function_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of a model with nested definitions inlined, for use as function parameters."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
     
-    except Exception as e:
-        logger.error(f"Error generating itinerary: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate itinerary: {str(e)}")
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return inline(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+    
+    return inline(schema)
 
-@app.post("/recommendations")
-async def get_recommendations(request: RecommendationRequest):
+async def complete_structured(messages: List[Dict[str, str]], model: Type[StructuredModel], name: str, **kwargs) -> StructuredModel:
     """
-    Get personalized travel recommendations for a destination.
-    
-    This endpoint provides recommendations for attractions, restaurants, activities,
-    and hotels based on the user's interests, budget, and trip duration.
+    Run one chat completion that must answer by calling function `name` with arguments
+    matching model. Raises ValueError (including pydantic's ValidationError) if it doesn't.
     """
-    try:
-        # Default travelers if not provided
-        travelers = request.travelers or {"adults": 1, "children": 0}
-        
-        # Build prompt for recommendations
-        prompt = f"""
+    tool = {"type": "function", "function": {"name": name, "parameters": function_schema(model)}}
+    async with llm_slot():
+        response = await llm_client.chat.completions.create(
+            messages=messages,
+            tools=[tool],
+            tool_choice={"type": "function", "function": {"name": name}},
+            **kwargs
+        )
+    calls = response.choices[0].message.tool_calls
+    if not calls:
+        raise ValueError(f"Model did not call {name}")
+    return model.model_validate_json(calls[0].function.arguments)
+
+STRUCTURED_ITINERARY_INSTRUCTIONS = """
+Return the itinerary by calling save_itinerary, with one daily_plans entry per day and plain text (no markdown) in every field.
+"""
+
+SLOT_LABELS = (
+    ("breakfast", "Breakfast"), ("morning", "Morning"), ("lunch", "Lunch"),
+    ("afternoon", "Afternoon"), ("dinner", "Dinner"), ("evening", "Evening"),
+)
+
+def render_itinerary(city: str, plan: StructuredItinerary) -> str:
+    """Markdown prose for a structured itinerary, laid out like the prose-mode output."""
+    lines = [f"# Your {city} Itinerary", "", plan.introduction, "", "## Highlights"]
+    lines += [f"- {highlight}" for highlight in plan.highlights]
+    for day in plan.daily_plans:
+        lines += ["", f"## Day {day.day}"]
+        lines += [f"**{label}:** {getattr(day, slot)}" for slot, label in SLOT_LABELS if getattr(day, slot)]
+    return "\n".join(lines)
+
+def structured_itinerary_result(city: str, plan: StructuredItinerary) -> Dict[str, Any]:
+    """Same body as build_itinerary_result, taken from the structure instead of parsed from text."""
+    return {
+        "itinerary": render_itinerary(city, plan),
+        "highlights": plan.highlights,
+        "daily_plans": [day.model_dump() for day in plan.daily_plans],
+        "estimated_costs": plan.estimated_costs.model_dump()
+    }
+
+RECOMMENDATION_SYSTEM_PROMPT = "You are a travel expert with extensive knowledge of destinations worldwide."
+RECOMMENDATION_COMPLETION_ARGS = {"model": "gpt-4", "temperature": 0.7, "max_tokens": 2000}
+
+def build_recommendation_prompt(request: RecommendationRequest) -> str:
+    """Build the recommendations prompt shared by the prose and structured modes."""
+    # Default travelers if not provided
+    travelers = request.travelers or {"adults": 1, "children": 0}
+    
+    return f"""
 You are a travel expert providing recommendations for {request.city}. 
 
 Trip Details:
@@ -336,132 +347,391 @@ For each recommendation, provide a name, brief description (1-2 sentences), and
 Format your response as a structured list with clear categories.
 """
 
-        # Call OpenAI API for recommendations
-        response = openai.chat.completions.create(
-            model="gpt-4",  # Adjust based on your requirements
-            messages=[
-                {"role": "system", "content": "You are a travel expert with extensive knowledge of destinations worldwide."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
+STRUCTURED_RECOMMENDATION_INSTRUCTIONS = """
+Return the recommendations by calling save_recommendations, with plain text (no markdown) in every field.
+"""
+
+# Where each category is read from in a prose response: from its heading up to the next category's
+RECOMMENDATION_SECTIONS = (
+    ("recommended_attractions", re.compile(r"(?:attractions|places to visit|sights).*?(?=restaurants|dining|eating|$)", re.DOTALL | re.IGNORECASE)),
+    ("recommended_restaurants", re.compile(r"(?:restaurants|dining|places to eat).*?(?=activities|experiences|things to do|$)", re.DOTALL | re.IGNORECASE)),
+    ("recommended_activities", re.compile(r"(?:activities|experiences|things to do).*?(?=accommodation|hotels|places to stay|$)", re.DOTALL | re.IGNORECASE)),
+    ("recommended_hotels", re.compile(r"(?:accommodation|hotels|places to stay).*", re.DOTALL | re.IGNORECASE)),
+)
+# Numbered or bulleted items
+RECOMMENDATION_ITEM = re.compile(r"(?:\d+\.|[\*\-])\s+(.*?)(?=(?:\d+\.|[\*\-])|$)", re.DOTALL)
+
+def split_recommendation_item(item: str) -> Dict[str, str]:
+    """Split "Name: description" or "Name - description"; otherwise the whole item is the name."""
+    for separator in (":", " - "):
+        parts = item.split(separator, 1)
+        if len(parts) > 1:
+            return {"name": parts[0].strip(), "description": parts[1].strip()}
+    return {"name": item.strip(), "description": ""}
+
+def parse_recommendations(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Extract the four recommendation categories from a prose response."""
+    recommendations = {}
+    for field, pattern in RECOMMENDATION_SECTIONS:
+        section = pattern.search(text)
+        items = RECOMMENDATION_ITEM.findall(section.group(0)) if section else []
+        recommendations[field] = [split_recommendation_item(item) for item in items]
+    return recommendations
+
+def decorate_recommendations(recommendations: Dict[str, List[Dict[str, Any]]], request: RecommendationRequest) -> Dict[str, List[Dict[str, Any]]]:
+    """Add the ratings, addresses and price levels clients expect on restaurants and hotels."""
+    price_level = {"budget": "$", "medium": "$$"}.get(request.budget, "$$$")
+    for restaurant in recommendations["recommended_restaurants"]:
+        # Placeholders, would typically come from a database
+        restaurant.update({"rating": 4.5, "address": request.city})
+    for hotel in recommendations["recommended_hotels"]:
+        hotel.update({"price_level": price_level, "rating": 4.0})  # Placeholder rating
+    return recommendations
+
+# --- Response cache ---
+class LLMResponseCache:
+    """
+    Cache of LLM responses keyed on a canonicalized request.
+
+    A request is split into a partition (fields that must match exactly, e.g. city
+    and trip length) and details (fields where a near match is good enough, e.g.
+    interests). Exact matches on both are served straight from the store. With a
+    similarity threshold, each partition also keeps a small in-memory index of
+    detail embeddings, and the closest earlier request at or above the threshold
+    is reused. Only responses are persisted: after a restart, near-duplicate
+    matching resumes as new responses are stored.
+
+    The store may do disk I/O (SQLite backend), so it is only touched from a
+    worker thread, never on the event loop.
+    """
+
+    def __init__(self, store: Optional[ResponseCache], similarity: float = 0.0,
+                 index_size: int = 16, max_partitions: int = 1024):
+        self.store = store
+        self.similarity = similarity
+        self.index_size = index_size
+        self.max_partitions = max_partitions
+        # partition key -> (response keys, matrix of their normalized embeddings), LRU order
+        self._index: "OrderedDict[str, Tuple[List[str], np.ndarray]]" = OrderedDict()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def probe(self, kind: str, partition: Dict[str, Any], details: Dict[str, Any]) -> Dict[str, Any]:
+        """Keys and embedding text for one request; pass the result to get() and put()."""
+        partition = {"kind": kind, **partition}
+        return {
+            "key": make_cache_key({**partition, **details}),
+            "index_key": make_cache_key({**partition, "embedding_model": LLM_CACHE_EMBEDDING_MODEL}),
+            "text": json.dumps(details, sort_keys=True),
+            "vector": None,
+        }
+
+    async def get(self, probe: Dict[str, Any]) -> Optional[Any]:
+        if self.store is None:
+            return None
+        value = await asyncio.to_thread(self.store.get, probe["key"])
+        if value is not None:
+            self.exact_hits += 1
+            return value
+        entry = self._index.get(probe["index_key"])
+        if self.similarity > 0 and entry is not None:
+            vector = await self._embed(probe)
+            if vector is not None:
+                keys, matrix = entry
+                scores = matrix @ vector
+                best = int(scores.argmax())
+                if scores[best] >= self.similarity:
+                    value = await asyncio.to_thread(self.store.get, keys[best])
+                    if value is not None:
+                        logger.info(f"Semantic cache hit (similarity {scores[best]:.3f})")
+                        self.semantic_hits += 1
+                        return value
+        self.misses += 1
+        return None
+
+    async def put(self, probe: Dict[str, Any], value: Any) -> None:
+        if self.store is None:
+            return
+        await asyncio.to_thread(self.store.set, probe["key"], value)
+        if self.similarity > 0:
+            vector = await self._embed(probe)
+            if vector is not None:
+                self._add_to_index(probe["index_key"], probe["key"], vector)
+
+    def skip(self) -> None:
+        """Record a request that asked to bypass the cache."""
+        self.bypassed += 1
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        stats = {
+            "enabled": self.store is not None,
+            "similarity": self.similarity,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "index_partitions": len(self._index),
+        }
+        if self.store is not None:
+            store = await asyncio.to_thread(self.store.stats)
+            stats["store"] = {k: store[k] for k in ("backend", "size", "maxsize", "ttl", "evictions")}
+        return stats
+
+    def _add_to_index(self, index_key: str, key: str, vector: np.ndarray) -> None:
+        keys, matrix = self._index.pop(index_key, ([], np.empty((0, vector.size), dtype=np.float32)))
+        if key in keys:
+            keep = [i for i, k in enumerate(keys) if k != key]
+            keys, matrix = [keys[i] for i in keep], matrix[keep]
+        keys = (keys + [key])[-self.index_size:]
+        matrix = np.vstack([matrix, vector])[-self.index_size:]
+        self._index[index_key] = (keys, matrix)
+        while len(self._index) > self.max_partitions:
+            self._index.popitem(last=False)
+
+    async def _embed(self, probe: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Normalized embedding of the request details, fetched once per probe."""
+        if probe["vector"] is None:
+            try:
+                response = await llm_client.embeddings.create(model=LLM_CACHE_EMBEDDING_MODEL, input=probe["text"])
+                vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+                probe["vector"] = vector / (np.linalg.norm(vector) or 1.0)
+            except Exception as e:
+                logger.warning(f"Response cache embedding failed, using exact matches only: {str(e)}")
+                probe["vector"] = False
+        return probe["vector"] if probe["vector"] is not False else None
+
+response_cache = LLMResponseCache(
+    build_cache("LLM", ttl=86400, maxsize=2000, path="cache/llm_responses.sqlite", backend="sqlite"),
+    similarity=LLM_CACHE_SIMILARITY,
+)
+
+def itinerary_cache_probe(request: ItineraryRequest) -> Dict[str, Any]:
+    """
+    Canonical itinerary request. Travel dates are left out: only the trip length
+    shapes the plan, and cached text is re-dated on the way out.
+    """
+    restaurants = [r.get("name", r.get("NAME", "")) for r in request.restaurants]
+    return response_cache.probe(
+        "itinerary",
+        {
+            "city": request.city.strip().lower(),
+            "trip_length": calculate_trip_length(request.departure_date, request.return_date, default_nights=3),
+            "trip_style": request.trip_style.lower(),
+            "budget_level": request.budget_level.lower(),
+            "structured": request.structured,
+            **ITINERARY_COMPLETION_ARGS,
+        },
+        {
+            "interests": sorted({i.strip().lower() for i in request.interests}),
+            "attractions": sorted(request.attractions),
+            # The prompt only shows the first 10
+            "restaurants": sorted(name for name in restaurants if name)[:10],
+            "flight_info": request.flight_info,
+            "hotel_info": request.hotel_info,
+        },
+    )
+
+def redate_itinerary(itinerary: str, cached: Dict[str, Any], request: ItineraryRequest) -> str:
+    """Swap the travel dates a cached itinerary was written for with the requested ones."""
+    for old, new in ((cached["departure_date"], request.departure_date), (cached.get("return_date"), request.return_date)):
+        if old and new and old != new:
+            itinerary = itinerary.replace(format_date_display(old), format_date_display(new)).replace(old, new)
+    return itinerary
+
+def recommendation_cache_probe(request: RecommendationRequest) -> Dict[str, Any]:
+    travelers = request.travelers or {"adults": 1, "children": 0}
+    return response_cache.probe(
+        "recommendations",
+        {
+            "city": request.city.strip().lower(),
+            "budget": request.budget.lower(),
+            "duration": request.duration,
+            "adults": travelers.get("adults", 1),
+            "children": travelers.get("children", 0),
+            "structured": request.structured,
+        },
+        {"interests": sorted({i.strip().lower() for i in request.interests})},
+    )
+
+async def cached_itinerary(request: ItineraryRequest, probe: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Itinerary result for request from the response cache, or None."""
+    if not request.use_cache:
+        response_cache.skip()
+        return None
+    cached = await response_cache.get(probe)
+    if cached is None:
+        return None
+    if "structured" in cached:
+        result = structured_itinerary_result(request.city, StructuredItinerary.model_validate(cached["structured"]))
+        result["itinerary"] = redate_itinerary(result["itinerary"], cached, request)
+        return result
+    return build_itinerary_result(redate_itinerary(cached["itinerary"], cached, request), request.budget_level)
+
+async def store_itinerary(request: ItineraryRequest, probe: Dict[str, Any], **content) -> None:
+    """Cache an itinerary as itinerary=<text> or structured=<StructuredItinerary dict>."""
+    await response_cache.put(probe, {
+        **content,
+        "departure_date": request.departure_date,
+        "return_date": request.return_date,
+    })
+
+async def structured_itinerary(request: ItineraryRequest, probe: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Generate and cache an itinerary in structured mode; None if the model's output did not validate."""
+    messages = itinerary_messages(build_itinerary_prompt(request) + STRUCTURED_ITINERARY_INSTRUCTIONS)
+    try:
+        plan = await complete_structured(messages, StructuredItinerary, "save_itinerary", **ITINERARY_COMPLETION_ARGS)
+    except ValueError as e:
+        logger.warning(f"Structured itinerary did not validate, falling back to prose: {str(e)}")
+        return None
+    await store_itinerary(request, probe, structured=plan.model_dump())
+    return structured_itinerary_result(request.city, plan)
+
+# Disable proxy buffering so events reach the client as they are produced
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# --- API Endpoints ---
+@app.get("/")
+async def root():
+    """Root endpoint returning server information."""
+    return {
+        "name": "MCP Server for Travel Explorer",
+        "version": "1.0.0",
+        "status": "running"
+    }
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    return {"status": "healthy", "llm": {"limit": MCP_MAX_CONCURRENT_LLM, **llm_counts}}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit rates and size of the LLM response cache."""
+    return await response_cache.stats()
+
+@app.post("/generate/itinerary")
+async def generate_itinerary(request: ItineraryRequest):
+    """
+    Generate a personalized travel itinerary using LLM.
+    
+    This endpoint uses OpenAI's GPT model to create detailed, day-by-day travel itineraries
+    based on the provided destination, attractions, restaurants, and other parameters.
+    """
+    try:
+        probe = itinerary_cache_probe(request)
+        cached = await cached_itinerary(request, probe)
+        if cached is not None:
+            return cached
         
-        # Process the response to extract structured recommendations
-        recommendation_text = response.choices[0].message.content
+        if request.structured:
+            result = await structured_itinerary(request, probe)
+            if result is not None:
+                return result
         
-        # Process attractions
-        attractions_section = re.search(r"(?:attractions|places to visit|sights).*?(?=restaurants|dining|eating|$)", recommendation_text, re.DOTALL | re.IGNORECASE)
-        attractions = []
-        if attractions_section:
-            # Extract numbered or bulleted items
-            items = re.findall(r"(?:\d+\.|[\*\-])\s+(.*?)(?=(?:\d+\.|[\*\-])|$)", attractions_section.group(0), re.DOTALL)
-            for item in items:
-                # Try to extract name and description
-                parts = item.split(":", 1)
-                if len(parts) > 1:
-                    name = parts[0].strip()
-                    description = parts[1].strip()
-                else:
-                    # Try to extract name and description with dash or hyphen
-                    parts = item.split(" - ", 1)
-                    if len(parts) > 1:
-                        name = parts[0].strip()
-                        description = parts[1].strip()
-                    else:
-                        # Just use the whole item as name
-                        name = item.strip()
-                        description = ""
-                
-                attractions.append({"name": name, "description": description})
+        prompt = build_itinerary_prompt(request)
+
+        # Call OpenAI API to generate the itinerary
+        itinerary = await complete(itinerary_messages(prompt), **ITINERARY_COMPLETION_ARGS)
+        await store_itinerary(request, probe, itinerary=itinerary)
+        return build_itinerary_result(itinerary, request.budget_level)
+    
+    except Exception as e:
+        logger.error(f"Error generating itinerary: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate itinerary: {str(e)}")
+
+@app.post("/generate/itinerary/stream")
+async def stream_itinerary(request: ItineraryRequest):
+    """
+    Generate an itinerary as Server-Sent Events.
+    
+    Emits a "token" event ({"text": ...}) for each piece of generated text as soon as
+    the model produces it, then a single "done" event with the same body as
+    /generate/itinerary, or an "error" event if generation fails. A cached or
+    structured-mode itinerary arrives as a single token event.
+    """
+    prompt = build_itinerary_prompt(request)
+    
+    async def events():
+        chunks = []
+        try:
+            probe = itinerary_cache_probe(request)
+            result = await cached_itinerary(request, probe)
+            if result is None and request.structured:
+                result = await structured_itinerary(request, probe)
+            if result is not None:
+                yield format_sse("token", {"text": result["itinerary"]})
+                yield format_sse("done", result)
+                return
+            
+            # Hold the slot until the stream is exhausted or the client goes away
+            async with llm_slot():
+                stream = await llm_client.chat.completions.create(
+                    messages=itinerary_messages(prompt),
+                    stream=True,
+                    **ITINERARY_COMPLETION_ARGS
+                )
+                async for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        chunks.append(text)
+                        yield format_sse("token", {"text": text})
+            itinerary = "".join(chunks)
+            await store_itinerary(request, probe, itinerary=itinerary)
+            yield format_sse("done", build_itinerary_result(itinerary, request.budget_level))
+        except Exception as e:
+            logger.error(f"Error streaming itinerary: {str(e)}")
+            yield format_sse("error", {"error": f"Failed to generate itinerary: {str(e)}"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.post("/recommendations")
+async def get_recommendations(request: RecommendationRequest):
+    """
+    Get personalized travel recommendations for a destination.
+    
+    This endpoint provides recommendations for attractions, restaurants, activities,
+    and hotels based on the user's interests, budget, and trip duration.
+    """
+    try:
+        probe = recommendation_cache_probe(request)
+        if not request.use_cache:
+            response_cache.skip()
+        else:
+            cached = await response_cache.get(probe)
+            if cached is not None:
+                return cached
         
-        # Process restaurants
-        restaurants_section = re.search(r"(?:restaurants|dining|places to eat).*?(?=activities|experiences|things to do|$)", recommendation_text, re.DOTALL | re.IGNORECASE)
-        restaurants = []
-        if restaurants_section:
-            items = re.findall(r"(?:\d+\.|[\*\-])\s+(.*?)(?=(?:\d+\.|[\*\-])|$)", restaurants_section.group(0), re.DOTALL)
-            for item in items:
-                parts = item.split(":", 1)
-                if len(parts) > 1:
-                    name = parts[0].strip()
-                    description = parts[1].strip()
-                else:
-                    parts = item.split(" - ", 1)
-                    if len(parts) > 1:
-                        name = parts[0].strip()
-                        description = parts[1].strip()
-                    else:
-                        name = item.strip()
-                        description = ""
-                
-                restaurants.append({
-                    "name": name, 
-                    "description": description,
-                    "rating": 4.5,  # Placeholder, would typically come from a database
-                    "address": request.city  # Placeholder
-                })
+        prompt = build_recommendation_prompt(request)
+        messages = [
+            {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
         
-        # Process activities
-        activities_section = re.search(r"(?:activities|experiences|things to do).*?(?=accommodation|hotels|places to stay|$)", recommendation_text, re.DOTALL | re.IGNORECASE)
-        activities = []
-        if activities_section:
-            items = re.findall(r"(?:\d+\.|[\*\-])\s+(.*?)(?=(?:\d+\.|[\*\-])|$)", activities_section.group(0), re.DOTALL)
-            for item in items:
-                parts = item.split(":", 1)
-                if len(parts) > 1:
-                    name = parts[0].strip()
-                    description = parts[1].strip()
-                else:
-                    parts = item.split(" - ", 1)
-                    if len(parts) > 1:
-                        name = parts[0].strip()
-                        description = parts[1].strip()
-                    else:
-                        name = item.strip()
-                        description = ""
-                
-                activities.append({"name": name, "description": description})
+        recommendations = None
+        if request.structured:
+            try:
+                structured = await complete_structured(
+                    messages[:1] + [{"role": "user", "content": prompt + STRUCTURED_RECOMMENDATION_INSTRUCTIONS}],
+                    StructuredRecommendations,
+                    "save_recommendations",
+                    **RECOMMENDATION_COMPLETION_ARGS
+                )
+                recommendations = structured.model_dump()
+            except ValueError as e:
+                logger.warning(f"Structured recommendations did not validate, falling back to prose: {str(e)}")
         
-        # Process hotels
-        hotels_section = re.search(r"(?:accommodation|hotels|places to stay).*", recommendation_text, re.DOTALL | re.IGNORECASE)
-        hotels = []
-        if hotels_section:
-            items = re.findall(r"(?:\d+\.|[\*\-])\s+(.*?)(?=(?:\d+\.|[\*\-])|$)", hotels_section.group(0), re.DOTALL)
-            for item in items:
-                parts = item.split(":", 1)
-                if len(parts) > 1:
-                    name = parts[0].strip()
-                    description = parts[1].strip()
-                else:
-                    parts = item.split(" - ", 1)
-                    if len(parts) > 1:
-                        name = parts[0].strip()
-                        description = parts[1].strip()
-                    else:
-                        name = item.strip()
-                        description = ""
-                
-                price_level = ""
-                if request.budget == "budget":
-                    price_level = "$"
-                elif request.budget == "medium":
-                    price_level = "$$"
-                else:
-                    price_level = "$$$"
-                
-                hotels.append({
-                    "name": name, 
-                    "description": description,
-                    "price_level": price_level,
-                    "rating": 4.0  # Placeholder
-                })
+        if recommendations is None:
+            # Call OpenAI API for recommendations and extract them from the prose
+            recommendation_text = await complete(messages, **RECOMMENDATION_COMPLETION_ARGS)
+            recommendations = parse_recommendations(recommendation_text)
         
-        return {
-            "recommended_attractions": attractions,
-            "recommended_restaurants": restaurants,
-            "recommended_activities": activities,
-            "recommended_hotels": hotels
-        }
+        recommendations = decorate_recommendations(recommendations, request)
+        await response_cache.put(probe, recommendations)
+        return recommendations
     
     except Exception as e:
         logger.error(f"Error generating recommendations: {str(e)}")
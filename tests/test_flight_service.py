@@ -0,0 +1,59 @@
+import pytest
+
+from api.services.flight_service import FlightService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("SERP_API_KEY", "test")
+    monkeypatch.setenv("FLIGHT_CACHE_BACKEND", "none")
+    return FlightService()
+
+
+def test_pairings_sorted_by_total_price(service):
+    flights = {
+        "outbound_flights": [{"price": 300}, {"price": "120"}],
+        "return_flights": [{"price": 80}, {"price": 200.5}],
+    }
+    pairings = service._with_pairings(flights, max_pairings=10)["pairings"]
+    assert [(p["outbound_index"], p["return_index"], p["total_price"]) for p in pairings] == [
+        (1, 0, 200.0), (1, 1, 320.5), (0, 0, 380.0), (0, 1, 500.5),
+    ]
+
+
+def test_pairings_with_non_numeric_prices_sort_last(service):
+    flights = {
+        "outbound_flights": [{"price": "N/A"}, {"price": 100}, {}],
+        "return_flights": [{"price": 50}, {"price": None}],
+    }
+    pairings = service._with_pairings(flights, max_pairings=10)["pairings"]
+    assert pairings[0] == {"outbound_index": 1, "return_index": 0, "total_price": 150.0}
+    assert all(p["total_price"] is None for p in pairings[1:])
+    assert len(pairings) == 6
+
+
+def test_pairings_are_capped(service):
+    flights = {"outbound_flights": [{"price": i} for i in range(4)], "return_flights": [{"price": 1}] * 4}
+    assert len(service._with_pairings(flights, max_pairings=3)["pairings"]) == 3
+
+
+def test_pairings_pass_errors_through(service):
+    assert service._with_pairings({"error": "boom"}, max_pairings=3) == {"error": "boom"}
+
+
+def test_sync_search_runs_the_async_implementation(service):
+    calls = []
+
+    async def asearch_flights(**kwargs):
+        calls.append(kwargs)
+        return {"outbound_flights": [], "return_flights": []}
+
+    service.extractor.asearch_flights = asearch_flights
+    service.extractor.extract_important_flight_info = lambda raw: raw
+    result = service.get_round_trip_flights("BOS", "LAX", "2999-01-01", "2999-01-05")
+    assert result["pairings"] == []
+    assert calls[0]["infants_in_seat"] == 0 and calls[0]["deep_search"] is True
+
+
+def test_past_departure_is_rejected(service):
+    assert "error" in service.search_flights("BOS", "LAX", "2000-01-01")
@@ -0,0 +1,70 @@
+from backend.itinerary_parser import BASE_COSTS, MAX_HIGHLIGHTS, costs_for, parse_itinerary
+
+ITINERARY = """# Your Boston Adventure
+
+**Key Highlights:**
+- Walk the Freedom Trail
+- Catch a game at Fenway Park
+
+**Getting Around:**
+- Take the T between neighborhoods
+
+## Day 1: History
+**Morning (9:00 AM - 12:00 PM):** Start at Boston Common.
+- Follow the Freedom Trail with a guide
+**Lunch:** Neptune Oyster
+**Afternoon:** Museum of Fine Arts
+**Evening:** Harbor walk
+
+## Day 2: Sports
+Midday: Fenway Park tour
+Dinner: Giacomo's
+Night: Take a taxi back to the hotel
+"""
+
+
+def test_daily_plans_are_split_by_day_and_slot():
+    plans = parse_itinerary(ITINERARY)["daily_plans"]
+    assert [p["day"] for p in plans] == [1, 2]
+    assert plans[0]["morning"] == "Start at Boston Common.\n- Follow the Freedom Trail with a guide"
+    assert plans[0]["lunch"] == "Neptune Oyster"
+    assert plans[0]["afternoon"] == "Museum of Fine Arts"
+    assert plans[0]["evening"] == "Harbor walk"
+    # Aliases: midday -> afternoon, night -> evening
+    assert plans[1]["afternoon"] == "Fenway Park tour"
+    assert plans[1]["evening"] == "Take a taxi back to the hotel"
+    assert plans[1]["breakfast"] == ""
+
+
+def test_highlights_stop_at_the_next_section_header():
+    assert parse_itinerary(ITINERARY)["highlights"] == ["Walk the Freedom Trail", "Catch a game at Fenway Park"]
+
+
+def test_highlights_section_without_bullets_uses_lines():
+    text = "Highlights:\nThe Freedom Trail\nFenway Park\nEstimated Costs:\nAbout $200 a day\n\nDay 1: Arrive"
+    assert parse_itinerary(text)["highlights"] == ["The Freedom Trail", "Fenway Park"]
+
+
+def test_highlights_fall_back_to_phrases():
+    text = "Stroll to the famous Public Garden, then visit the aquarium."
+    highlights = parse_itinerary(text)["highlights"]
+    assert highlights and len(highlights) <= MAX_HIGHLIGHTS
+
+
+def test_cost_signals_adjust_the_base_costs():
+    signals = parse_itinerary(ITINERARY)["cost_signals"]
+    assert signals == {"activities", "transportation"}
+    costs = costs_for("Budget", signals)
+    assert costs["accommodation"] == BASE_COSTS["budget"]["accommodation"]
+    assert costs["activities"] == BASE_COSTS["budget"]["activities"] * 1.15
+    assert costs["transportation"] == BASE_COSTS["budget"]["transportation"] * 1.3
+
+
+def test_costs_for_does_not_mutate_the_base_table():
+    costs_for("luxury", {"luxury"})
+    assert BASE_COSTS["luxury"]["food"] == 150
+    assert costs_for("unknown", set()) == BASE_COSTS["medium"]
+
+
+def test_empty_itinerary():
+    assert parse_itinerary("") == {"daily_plans": [], "highlights": [], "cost_signals": set()}
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from backend import response_cache
+from backend.response_cache import MemoryCache, ResponseCache, SQLiteCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_make_cache_key_ignores_credentials_order_and_padding():
+    a = make_cache_key({"q": " boston ", "api_key": "secret", "n": 1})
+    b = make_cache_key({"n": 1, "q": "boston", "api_key": "other"})
+    assert a == b
+    assert a != make_cache_key({"q": "boston", "n": 2})
+
+
+def test_response_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache(ttl=1, maxsize=1)
+
+
+def test_memory_cache_expires_entries(clock):
+    cache = MemoryCache(ttl=10, maxsize=4)
+    cache.set("a", 1)
+    clock[0] += 9
+    assert cache.get("a") == 1
+    clock[0] += 2
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_memory_cache_evicts_by_weight():
+    cache = MemoryCache(ttl=60, maxsize=10, max_weight=5, weigher=len)
+    cache.set("a", [1, 2, 3])
+    cache.set("b", [1, 2])
+    cache.set("c", [1])
+    assert cache.get("a") is None
+    assert cache.weight == 3
+
+
+def test_memory_cache_rejects_entry_heavier_than_max_weight():
+    cache = MemoryCache(ttl=60, maxsize=10, max_weight=5, weigher=len)
+    cache.set("small", [1])
+    cache.set("big", list(range(6)))
+    assert cache.get("big") is None
+    assert cache.get("small") == [1]
+    assert cache.weight == 1
+
+
+def test_memory_cache_replacing_a_key_updates_weight():
+    cache = MemoryCache(ttl=60, maxsize=10, max_weight=5, weigher=len)
+    cache.set("a", [1, 2, 3])
+    cache.set("a", [1])
+    assert cache.weight == 1
+
+
+def test_sqlite_cache_persists_and_expires(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path, ttl=10, maxsize=10)
+    cache.set("a", {"x": [1, 2]})
+    assert SQLiteCache(path, ttl=10, maxsize=10).get("a") == {"x": [1, 2]}
+    clock[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_sqlite_cache_evicts_least_recently_read(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=60, maxsize=2)
+    cache.set("a", 1)
+    clock[0] += 1
+    cache.set("b", 2)
+    clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_sqlite_cache_buffers_hit_recency_until_batch(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=60, maxsize=10, touch_batch=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    clock[0] += 5
+
+    def accessed(key):
+        return cache._conn.execute("SELECT accessed_at FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+    cache.get("a")
+    assert accessed("a") == 1000.0
+    cache.get("b")
+    assert accessed("a") == accessed("b") == 1005.0
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+
+def test_do_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while flight.coalesced == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == ["result", "result"]
+    assert len(calls) == 1
+    assert flight._calls == {}
+
+
+def test_do_shares_errors_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_ado_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(*[flight.ado("k", fetch, i) for i in range(5)])
+
+    assert asyncio.run(main()) == [0] * 5
+    assert calls == [0]
+    assert flight.coalesced == 4
+
+
+def test_ado_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.create_task(flight.ado("k", fetch))
+        second = asyncio.create_task(flight.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        result = await second
+        # The finished call is forgotten, so the next one fetches again
+        await flight.ado("k", fetch)
+        return result
+
+    assert asyncio.run(main()) == "result"
+    assert len(calls) == 2
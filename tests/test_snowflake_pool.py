@@ -0,0 +1,122 @@
+import pytest
+
+from backend.snowflake_pool import SessionPool
+
+
+class FakeSession:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+
+    def sql(self, query):
+        if not self.alive:
+            raise ConnectionError("session expired")
+        return self
+
+    def collect(self):
+        return [(1,)]
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    return SessionPool(factory, **kwargs), sessions
+
+
+def test_sessions_are_reused():
+    pool, sessions = make_pool(size=2)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
+    assert len(sessions) == 1
+    assert pool.stats()["acquired"] == 2
+
+
+def test_failed_work_discards_the_session():
+    pool, sessions = make_pool(size=2)
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            raise RuntimeError("query failed")
+    assert sessions[0].closed
+    assert pool.stats()["open"] == 0
+    assert pool.stats()["discarded"] == 1
+
+
+def test_run_retries_on_a_fresh_session():
+    pool, sessions = make_pool(size=2)
+    seen = []
+
+    def work(session):
+        seen.append(session)
+        if len(seen) == 1:
+            raise ConnectionError("dropped")
+        return "rows"
+
+    assert pool.run(work, retries=1) == "rows"
+    assert seen[0] is not seen[1]
+    assert seen[0].closed and not seen[1].closed
+
+
+def test_run_gives_up_after_retries():
+    pool, sessions = make_pool(size=2)
+
+    def work(session):
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        pool.run(work, retries=2)
+    assert len(sessions) == 3
+    assert pool.stats()["open"] == 0
+
+
+def test_idle_session_failing_probe_is_replaced():
+    pool, sessions = make_pool(size=1, probe_after=0)
+    with pool.session():
+        pass
+    sessions[0].alive = False
+    with pool.session() as session:
+        assert session is sessions[1]
+    assert pool.stats()["probe_failures"] == 1
+
+
+def test_idle_session_past_timeout_is_recycled():
+    pool, sessions = make_pool(size=1, idle_timeout=0)
+    with pool.session():
+        pass
+    with pool.session() as session:
+        assert session is sessions[1]
+    assert sessions[0].closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool, _ = make_pool(size=1, acquire_timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_factory_error_frees_the_slot():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("login failed")
+        return FakeSession()
+
+    pool = SessionPool(factory, size=1, acquire_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    assert isinstance(pool.acquire(), FakeSession)
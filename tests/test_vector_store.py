@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from backend.hotel_ingest import CITY_FIELD, PRICE_FIELD, RATING_FIELD, build_filter
+from backend.vector_store import LocalVectorStore, VectorStore, _matches_filter
+
+HOTEL = {CITY_FIELD: "boston", RATING_FIELD: 4.2, PRICE_FIELD: 180.0}
+
+
+@pytest.mark.parametrize("flt, expected", [
+    ({CITY_FIELD: "boston"}, True),
+    ({CITY_FIELD: {"$eq": "miami"}}, False),
+    ({CITY_FIELD: {"$ne": "miami"}}, True),
+    ({CITY_FIELD: {"$in": ["miami", "boston"]}}, True),
+    ({RATING_FIELD: {"$gte": 4.2}}, True),
+    ({RATING_FIELD: {"$gt": 4.2}}, False),
+    ({PRICE_FIELD: {"$lte": 180}}, True),
+    ({PRICE_FIELD: {"$lt": 180}}, False),
+    ({PRICE_FIELD: {"$gte": 100, "$lte": 200}}, True),
+    ({PRICE_FIELD: {"$exists": True}}, True),
+    ({"missing": {"$exists": False}}, True),
+    ({"missing": {"$gte": 1}}, False),
+    ({"$or": [{PRICE_FIELD: {"$lt": 100}}, {RATING_FIELD: {"$gte": 4}}]}, True),
+    ({"$or": [{PRICE_FIELD: {"$lt": 100}}, {RATING_FIELD: {"$gte": 5}}]}, False),
+    ({"$and": [{CITY_FIELD: "boston"}, {RATING_FIELD: {"$gte": 5}}]}, False),
+])
+def test_matches_filter_operators(flt, expected):
+    assert _matches_filter(HOTEL, flt) is expected
+
+
+def test_price_cap_keeps_hotels_without_a_price():
+    flt = build_filter("Boston", rating=4.0, max_price=150)
+    assert _matches_filter({CITY_FIELD: "boston", RATING_FIELD: 4.5}, flt)
+    assert not _matches_filter(HOTEL, flt)
+    assert not _matches_filter({CITY_FIELD: "boston", RATING_FIELD: 3.0}, flt)
+
+
+def test_vector_store_is_abstract():
+    with pytest.raises(TypeError):
+        VectorStore()
+
+
+@pytest.fixture
+def store():
+    rng = np.random.default_rng(0)
+    metadata = []
+    for i in range(300):
+        m = {CITY_FIELD: ["boston", "miami", "chicago"][i % 3], RATING_FIELD: float(rng.uniform(2, 5))}
+        if i % 4:
+            m[PRICE_FIELD] = float(rng.uniform(50, 400))
+        metadata.append(m)
+    vectors = rng.normal(size=(300, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return LocalVectorStore([f"h{i}" for i in range(300)], vectors, metadata)
+
+
+def brute_force(store, query, top_k, flt):
+    rows = [i for i, m in enumerate(store.metadata) if _matches_filter(m, flt)]
+    scores = store.vectors[rows] @ (query / np.linalg.norm(query))
+    return [store.ids[rows[i]] for i in np.argsort(-scores)[:top_k]]
+
+
+@pytest.mark.parametrize("flt", [
+    build_filter("Boston", rating=4.0, max_price=200),
+    {CITY_FIELD: "miami"},
+    {CITY_FIELD: {"$in": ["miami", "chicago"]}},
+    {CITY_FIELD: {"$exists": True}},
+])
+def test_local_query_matches_brute_force(store, flt):
+    query = np.random.default_rng(1).normal(size=8)
+    result = store.query(query, top_k=5, filter=flt)
+    assert [m["id"] for m in result["matches"]] == brute_force(store, query, 5, flt)
+
+
+def test_local_query_unknown_city_returns_nothing(store):
+    assert store.query(np.ones(8), top_k=5, filter={CITY_FIELD: "atlantis"}) == {"matches": []}